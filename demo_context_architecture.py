@@ -7,10 +7,78 @@ Demonstration of the complete 3-stage architecture with conversation context:
 4. Conversation context is updated for next turn
 """
 
+import argparse
+import asyncio
+
 from wholesale_agent.core.agent import WholesaleAgent
 
-def demonstrate_architecture():
-    """Demonstrate the full architecture with conversation context."""
+# Queries that depend on each other's context are grouped into one chain;
+# independent chains run concurrently on separate agents.
+QUERY_CHAINS = [
+    [
+        "how much stock of gaming keyboard do we have?",
+        "what about its price?", 
+        "remove 2 units of it",
+    ],
+    [
+        "show me all products with low stock",
+        "what about the wireless mouse?",
+        "adjust its stock to 100 units",
+    ],
+]
+
+# Upper bound on in-flight LLM round-trips to respect provider rate limits
+MAX_CONCURRENT_QUERIES = 4
+
+
+async def run_chain(agent: WholesaleAgent, chain, semaphore: asyncio.Semaphore):
+    """Run a chain of context-dependent queries in order on a single agent."""
+    results = []
+    for query in chain:
+        stats = agent.get_conversation_stats()
+        async with semaphore:
+            try:
+                response = f"🤖 Response: {await agent.aprocess_query(query)}"
+            except Exception as e:
+                response = f"❌ Error: {e}"
+        results.append((query, stats, response))
+    return results
+
+
+async def run_all_chains(agents):
+    """Run all query chains concurrently."""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_QUERIES)
+    return await asyncio.gather(*(
+        run_chain(agent, chain, semaphore) for agent, chain in zip(agents, QUERY_CHAINS)
+    ))
+
+
+def stream_chains(agents):
+    """Run the chains one after another, printing each response as it streams in."""
+    query_number = 0
+    for agent, chain in zip(agents, QUERY_CHAINS):
+        for query in chain:
+            query_number += 1
+            print(f"\n🔹 QUERY {query_number}: {query}")
+            print("-" * 40)
+            
+            stats = agent.get_conversation_stats()
+            if stats['has_context']:
+                print(f"📋 Context: {stats['recent_products']} recent products, last action: {stats['last_action']}")
+            
+            print("🤖 Response: ", end="", flush=True)
+            for chunk in agent.stream_query(query):
+                print(chunk, end="", flush=True)
+            print("\n")
+
+
+def demonstrate_architecture(stream: bool = False):
+    """Demonstrate the full architecture with conversation context.
+    
+    Args:
+        stream: Print responses token by token as they are generated instead of
+            running the chains concurrently and printing complete responses
+    """
     
     print("🚀 Wholesale AI Agent - Context-Aware Architecture Demo")
     print("=" * 60)
@@ -18,17 +86,9 @@ def demonstrate_architecture():
     print("\nNOTE: This demo shows the system architecture even without LLM API keys.")
     print("In production with LLM_API_KEY, the context system would work seamlessly.\n")
     
-    agent = WholesaleAgent()
-    
-    # Demo queries that show contextual understanding
-    queries = [
-        "how much stock of gaming keyboard do we have?",
-        "what about its price?", 
-        "remove 2 units of it",
-        "show me all products with low stock",
-        "what about the wireless mouse?",
-        "adjust its stock to 100 units"
-    ]
+    # One agent per chain so each conversation keeps its own context
+    agents = [WholesaleAgent() for _ in QUERY_CHAINS]
+    queries = [query for chain in QUERY_CHAINS for query in chain]
     
     print("🎯 DEMONSTRATION QUERIES:")
     for i, query in enumerate(queries, 1):
@@ -36,30 +96,31 @@ def demonstrate_architecture():
     
     print("\n" + "="*60)
     
-    for i, query in enumerate(queries, 1):
-        print(f"\n🔹 QUERY {i}: {query}")
-        print("-" * 40)
+    if stream:
+        stream_chains(agents)
+    else:
+        chain_results = asyncio.run(run_all_chains(agents))
+        results = [result for chain in chain_results for result in chain]
         
-        # Show conversation stats before processing
-        stats = agent.get_conversation_stats()
-        if stats['has_context']:
-            print(f"📋 Context: {stats['recent_products']} recent products, last action: {stats['last_action']}")
-        
-        # Process the query
-        try:
-            response = agent.process_query(query)
-            print(f"🤖 Response: {response}")
-        except Exception as e:
-            print(f"❌ Error: {e}")
-        
-        print()
+        for i, (query, stats, response) in enumerate(results, 1):
+            print(f"\n🔹 QUERY {i}: {query}")
+            print("-" * 40)
+            
+            # Show conversation stats before processing
+            if stats['has_context']:
+                print(f"📋 Context: {stats['recent_products']} recent products, last action: {stats['last_action']}")
+            
+            print(response)
+            print()
     
     # Final conversation statistics
     print("="*60)
     print("📊 FINAL CONVERSATION STATISTICS:")
-    final_stats = agent.get_conversation_stats()
-    for key, value in final_stats.items():
-        print(f"   • {key.replace('_', ' ').title()}: {value}")
+    for i, agent in enumerate(agents, 1):
+        print(f"   Conversation {i}:")
+        final_stats = agent.get_conversation_stats()
+        for key, value in final_stats.items():
+            print(f"   • {key.replace('_', ' ').title()}: {value}")
     
     print(f"\n💡 ARCHITECTURE BENEFITS:")
     print("   ✅ Contextual understanding (references like 'it', 'its', 'that')")
@@ -70,4 +131,9 @@ def demonstrate_architecture():
     print("   ✅ Console-friendly formatting (no markdown tables)")
 
 if __name__ == "__main__":
-    demonstrate_architecture()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Context-aware architecture demo')
+    parser.add_argument('--stream', action='store_true',
+                        help='Stream responses as they are generated (runs chains sequentially)')
+    args = parser.parse_args()
+    
+    demonstrate_architecture(stream=args.stream)
\ No newline at end of file
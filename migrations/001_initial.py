@@ -5,6 +5,9 @@ Created: 2025-01-15T00:00:00
 from sqlalchemy import text
 from wholesale_agent.models import db_manager
 
+# Dependent tables first
+TABLES = ["inventory_movements", "products", "categories", "suppliers"]
+
 
 def upgrade():
     """Apply migration - create initial schema."""
@@ -15,10 +18,18 @@ def upgrade():
 
 def downgrade():
     """Rollback migration - drop all tables."""
+    if db_manager.engine.dialect.name == 'sqlite':
+        # SQLite has no multi-table DROP or CASCADE; send the drops as one script
+        raw_connection = db_manager.engine.raw_connection()
+        try:
+            raw_connection.driver_connection.executescript(
+                "".join(f"DROP TABLE IF EXISTS {table};" for table in TABLES)
+            )
+        finally:
+            raw_connection.close()
+        return
+    
     with db_manager.get_session() as session:
-        # Drop all tables
-        session.execute(text("DROP TABLE IF EXISTS inventory_movements"))
-        session.execute(text("DROP TABLE IF EXISTS products"))
-        session.execute(text("DROP TABLE IF EXISTS categories"))
-        session.execute(text("DROP TABLE IF EXISTS suppliers"))
-        session.commit()
\ No newline at end of file
+        # Drop all tables in one statement; CASCADE removes dependent constraints
+        session.execute(text(f"DROP TABLE IF EXISTS {', '.join(TABLES)} CASCADE"))
+        session.commit()
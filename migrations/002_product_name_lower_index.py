@@ -0,0 +1,22 @@
+"""
+Migration: Index lower-cased product names for case-insensitive lookups
+Created: 2025-01-20T00:00:00
+"""
+from sqlalchemy import text
+from wholesale_agent.models import db_manager
+
+
+def upgrade():
+    """Apply migration - add functional index on LOWER(name)."""
+    with db_manager.get_session() as session:
+        session.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_product_name_lower ON products (LOWER(name))"
+        ))
+        session.commit()
+
+
+def downgrade():
+    """Rollback migration - drop the index."""
+    with db_manager.get_session() as session:
+        session.execute(text("DROP INDEX IF EXISTS idx_product_name_lower"))
+        session.commit()
@@ -3,6 +3,7 @@
 Direct inventory management script for wholesale agent.
 """
 import sys
+import json
 import argparse
 import os
 
@@ -25,6 +26,48 @@ def print_result(result: dict):
         print(f"❌ Error: {result['error']}")
 
 
+# Batch operation names mapped to InventoryManager methods
+BATCH_OPERATIONS = {
+    'add': 'add_stock',
+    'remove': 'remove_stock',
+    'adjust': 'adjust_stock',
+    'create': 'create_product',
+    'price': 'update_product_prices',
+}
+
+
+def run_batch(manager: InventoryManager, lines) -> bool:
+    """Run JSON-lines operations in one transaction, rolling back on the first failure."""
+    try:
+        with manager.session_scope():
+            for line_number, line in enumerate(lines, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                
+                try:
+                    operation = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"line {line_number}: invalid JSON ({e})")
+                if not isinstance(operation, dict):
+                    raise ValueError(f"line {line_number}: expected a JSON object")
+                
+                command = operation.pop('op', None)
+                if command not in BATCH_OPERATIONS:
+                    raise ValueError(f"line {line_number}: unknown operation '{command}'")
+                
+                result = getattr(manager, BATCH_OPERATIONS[command])(**operation)
+                print_result(result)
+                if not result['success']:
+                    raise ValueError(f"line {line_number}: {result['error']}")
+    except (ValueError, TypeError) as e:
+        print(f"❌ Batch aborted, all changes rolled back: {e}")
+        return False
+    
+    print("✅ Batch committed")
+    return True
+
+
 def main():
     """Main CLI for inventory management."""
     parser = argparse.ArgumentParser(description='Manage wholesale inventory directly')
@@ -81,6 +124,14 @@ def main():
     moves_parser.add_argument('product', help='Product SKU or name')
     moves_parser.add_argument('--limit', type=int, default=10, help='Number of movements to show')
     
+    # Batch command
+    batch_parser = subparsers.add_parser(
+        'batch', help='Run JSON-lines operations in a single transaction',
+        description='Each line is an object like {"op": "add", "product_identifier": "ELE-1234-001", '
+                    '"quantity": 5}; op is one of: ' + ', '.join(BATCH_OPERATIONS)
+    )
+    batch_parser.add_argument('--file', default='-', help='JSON-lines file (default: stdin)')
+    
     args = parser.parse_args()
     
     if not args.command:
@@ -146,6 +197,17 @@ def main():
             )
             print_result(result)
             
+        elif args.command == 'batch':
+            if args.file == '-':
+                success = run_batch(manager, sys.stdin)
+            else:
+                with open(args.file) as f:
+                    success = run_batch(manager, f)
+            
+            # Let scripted callers detect a rolled-back batch
+            if not success:
+                sys.exit(1)
+            
         elif args.command == 'movements':
             result = manager.get_stock_movements(
                 product_identifier=args.product,
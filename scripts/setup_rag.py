@@ -4,9 +4,9 @@ Setup script for RAG (Retrieval-Augmented Generation) pipeline.
 """
 import sys
 import os
+from importlib.util import find_spec
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from wholesale_agent.core.rag_pipeline import RAGPipeline
 from wholesale_agent.utils.logger import setup_logger
 
 
@@ -17,7 +17,15 @@ def main():
     print("🔍 Setting up RAG Pipeline for Wholesale Agent")
     print("=" * 50)
     
+    # Cheap probe before pulling in torch/sentence-transformers
+    if find_spec('sentence_transformers') is None or find_spec('faiss') is None:
+        print("❌ RAG pipeline is disabled")
+        print("💡 Install dependencies with: pip install sentence-transformers faiss-cpu")
+        return False
+    
     try:
+        from wholesale_agent.core.rag_pipeline import RAGPipeline
+        
         # Initialize RAG pipeline
         print("📚 Initializing RAG pipeline...")
         pipeline = RAGPipeline()
@@ -44,8 +52,8 @@ def main():
             "TechCorp supplier"
         ]
         
-        for query in test_queries:
-            results = pipeline.search_relevant_context(query, k=2)
+        batch_results = pipeline.search_batch(test_queries, k=2)
+        for query, results in zip(test_queries, batch_results):
             print(f"  Query: '{query}' -> {len(results)} results")
             
             for result in results[:1]:  # Show top result
@@ -11,13 +11,13 @@ long_description = readme_file.read_text(encoding="utf-8") if readme_file.exists
 
 # Read requirements
 requirements_file = Path(__file__).parent / "requirements.txt"
-requirements = []
-if requirements_file.exists():
-    with open(requirements_file) as f:
-        requirements = [
-            line.strip() for line in f.readlines()
-            if line.strip() and not line.startswith('#') and not line.startswith('-r')
-        ]
+requirements = [
+    requirement for requirement in (
+        line.split('#', 1)[0].strip()
+        for line in requirements_file.read_text(encoding="utf-8").splitlines()
+    )
+    if requirement and not requirement.startswith('-')
+] if requirements_file.exists() else []
 
 setup(
     name="wholesale-agent",
@@ -90,6 +90,8 @@ setup(
         "dev": [
             "pytest>=7.0.0",
             "pytest-cov>=4.0.0",
+            "pytest-xdist>=3.0.0",
+            "pytest-benchmark>=4.0.0",
             "black>=23.0.0",
             "flake8>=6.0.0",
             "mypy>=1.0.0",
@@ -141,7 +141,7 @@ def simulate_conversation_flow():
     for key, value in stats.items():
         print(f"• {key.replace('_', ' ').title()}: {value}")
     
-    print(f"\n🧠 Recent Products in Memory: {context.last_mentioned_products}")
+    print(f"\n🧠 Recent Products in Memory: {list(context.last_mentioned_products)}")
     print(f"💭 Conversation Summary: {context._get_conversation_summary()}")
 
 if __name__ == "__main__":
@@ -1,243 +1,368 @@
 """
 Test configuration and fixtures for wholesale agent tests.
 """
+import functools
 import pytest
-import os
-import tempfile
 from pathlib import Path
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, configure_mappers, sessionmaker
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.schema import CreateIndex, CreateTable
 
 from wholesale_agent.models import Base, db_manager
 from wholesale_agent.models import Category, Supplier, Product, InventoryMovement
-from wholesale_agent.utils.config import Config
+from wholesale_agent.utils.config import load_config
+
+try:
+    import xdist  # noqa: F401
+    XDIST_AVAILABLE = True
+except ImportError:
+    XDIST_AVAILABLE = False
+
+# Configure ORM mappers up front rather than on the first test's first query
+configure_mappers()
+
+# Schema DDL compiled once at import, in dependency order
+_DDL = [
+    str(ddl.compile(dialect=sqlite.dialect())).strip()
+    for table in Base.metadata.sorted_tables
+    for ddl in [CreateTable(table)] + [CreateIndex(index) for index in table.indexes]
+]
+
+
+@functools.lru_cache(maxsize=4)
+def _cached_load_config(debug=False):
+    """Load a configuration once per process for each debug setting."""
+    return load_config(debug=debug)
+
+
+# Models behind each list in the sample_data fixture
+_SAMPLE_DATA_MODELS = {
+    'categories': Category,
+    'suppliers': Supplier,
+    'products': Product,
+    'movements': InventoryMovement,
+}
 
 
 @pytest.fixture(scope="session")
 def test_config():
     """Create test configuration."""
-    return Config(debug=True)
+    return _cached_load_config(debug=True)
+
+
+@pytest.fixture(scope="session")
+def cached_load_config():
+    """load_config wrapper that shares results between tests; do not mutate them."""
+    return _cached_load_config
 
 
-@pytest.fixture(scope="function")
-def temp_db():
-    """Create temporary database for testing."""
-    with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
-        test_db_path = f.name
+if not XDIST_AVAILABLE:
+    @pytest.fixture(scope="session")
+    def worker_id():
+        """Fallback for the pytest-xdist worker_id fixture when running serially."""
+        return "master"
+
+
+def _create_test_engine(name):
+    """Create a named in-memory test database with the schema in place."""
+    # Named shared-cache database, so any connection this process opens
+    # (not only the pooled one) sees the same schema and rows
+    test_db_url = f"sqlite+pysqlite:///file:{name}?mode=memory&cache=shared&uri=true"
+    
+    # StaticPool shares the one in-memory connection between all sessions
+    engine = create_engine(
+        test_db_url,
+        echo=False,
+        logging_name=name,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    
+    # Let SQLAlchemy, not pysqlite, emit BEGIN so SAVEPOINTs work, and trade
+    # durability for speed since the database is thrown away after the run
+    @event.listens_for(engine, "connect")
+    def _configure_connection(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.execute("PRAGMA journal_mode=MEMORY")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA locking_mode=EXCLUSIVE")
+        cursor.execute("PRAGMA cache_size=-64000")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
     
-    test_db_url = f"sqlite:///{test_db_path}"
+    raw_connection = engine.raw_connection()
+    try:
+        raw_connection.driver_connection.executescript(";\n".join(_DDL) + ";")
+    finally:
+        raw_connection.close()
+    
+    return engine
+
+
+@pytest.fixture(scope="session")
+def test_engine(worker_id):
+    """Create the in-memory test database and schema once per test worker.
     
-    # Create test engine and session
-    engine = create_engine(test_db_url, echo=False)
-    Base.metadata.create_all(bind=engine)
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Each pytest-xdist worker is its own process, so every worker gets a
+    private in-memory database and the suite can run with ``-n auto``.
+    """
+    engine = _create_test_engine(f"wholesale_test_{worker_id}")
     
-    yield SessionLocal
+    yield engine
     
     # Cleanup
     engine.dispose()
-    if os.path.exists(test_db_path):
-        os.unlink(test_db_path)
+
+
+@pytest.fixture(scope="session")
+def seeded_engine(worker_id):
+    """Separate in-memory database that holds the shared seed rows.
+    
+    Kept apart from test_engine so tests that do not ask for sample data
+    always start from empty tables, whatever ran before them.
+    """
+    engine = _create_test_engine(f"wholesale_seeded_{worker_id}")
+    
+    yield engine
+    
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def temp_db(test_engine):
+    """Session factory bound to the shared test database."""
+    return sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
+
+
+@pytest.fixture(scope="session")
+def seed_data(seeded_engine):
+    """Insert the shared sample rows into seeded_engine once per test session.
+        
+    This covers both the single sample_* rows and the larger sample_data
+    set. Returns their primary keys; the per-test sample fixtures load them
+    through test_session, so changes a test makes are rolled back.
+    """
+    with Session(bind=seeded_engine) as session:
+        category = Category(
+            name="Electronics",
+            description="Electronic devices and accessories"
+        )
+        supplier = Supplier(
+            name="TechCorp Wholesale",
+            contact_email="orders@techcorp.com",
+            contact_phone="1-800-123-4567",
+            address="123 Tech Street, Silicon Valley, CA",
+            tax_id="TAX-123456789",
+            payment_terms="Net 30",
+            is_active=True
+        )
+        session.add_all([category, supplier])
+        session.flush()
+        
+        product = Product(
+            sku="ELE-1234-001",
+            name="Wireless Bluetooth Headphones",
+            description="High-quality wireless headphones with noise cancellation",
+            category_id=category.id,
+            supplier_id=supplier.id,
+            cost_price=45.00,
+            wholesale_price=65.00,
+            retail_price=99.99,
+            current_stock=100,
+            minimum_stock=20,
+            maximum_stock=500,
+            weight=0.5,
+            dimensions="20x15x8",
+            barcode="1234567890123",
+            is_active=True,
+            is_discontinued=False
+        )
+        session.add(product)
+        session.flush()
+        
+        movement = InventoryMovement(
+            product_id=product.id,
+            movement_type="INBOUND",
+            quantity=50,
+            unit_cost=45.00,
+            reference_number="PO-123456",
+            notes="Initial stock",
+            from_location=None,
+            to_location="Warehouse A"
+        )
+        session.add(movement)
+        session.flush()
+        
+        # Create additional categories
+        categories = [
+            Category(name="Clothing", description="Apparel and accessories"),
+            Category(name="Home & Garden", description="Home improvement items"),
+        ]
+        
+        # Create additional suppliers
+        suppliers = [
+            Supplier(
+                name="Fashion Plus",
+                contact_email="orders@fashionplus.com",
+                payment_terms="Net 15",
+                is_active=True
+            ),
+            Supplier(
+                name="Garden Supply Co",
+                contact_email="sales@gardensupply.com",
+                payment_terms="Net 45",
+                is_active=False
+            ),
+        ]
+        session.add_all(categories + suppliers)
+        session.flush()
+        
+        # Create products
+        products = [
+            Product(
+                sku="ELE-1235-001",
+                name="USB-C Cable",
+                category_id=category.id,
+                supplier_id=supplier.id,
+                cost_price=5.00,
+                wholesale_price=8.50,
+                retail_price=14.99,
+                current_stock=5,  # Low stock
+                minimum_stock=20,
+                maximum_stock=200,
+                is_active=True
+            ),
+            Product(
+                sku="CLO-2001-001", 
+                name="Cotton T-Shirt",
+                category_id=categories[0].id,
+                supplier_id=suppliers[0].id,
+                cost_price=8.00,
+                wholesale_price=14.00,
+                retail_price=24.99,
+                current_stock=0,  # Out of stock
+                minimum_stock=10,
+                maximum_stock=100,
+                is_active=True
+            ),
+            Product(
+                sku="HOM-3001-001",
+                name="Garden Hose",
+                category_id=categories[1].id,
+                supplier_id=suppliers[1].id,
+                cost_price=15.00,
+                wholesale_price=25.00,
+                retail_price=39.99,
+                current_stock=200,  # Overstocked
+                minimum_stock=10,
+                maximum_stock=50,
+                is_active=True
+            ),
+        ]
+        
+        session.add_all(products)
+        session.flush()
+        
+        # Create inventory movements
+        movements = [
+            InventoryMovement(
+                product_id=products[0].id,
+                movement_type="OUTBOUND",
+                quantity=-15,
+                reference_number="SO-001"
+            ),
+            InventoryMovement(
+                product_id=products[1].id,
+                movement_type="OUTBOUND", 
+                quantity=-10,
+                reference_number="SO-002"
+            ),
+            InventoryMovement(
+                product_id=products[2].id,
+                movement_type="INBOUND",
+                quantity=150,
+                reference_number="PO-789"
+            ),
+        ]
+    
+        session.add_all(movements)
+        session.commit()
+        
+        return {
+            'category': category.id,
+            'supplier': supplier.id,
+            'product': product.id,
+            'movement': movement.id,
+            'categories': [category.id] + [c.id for c in categories],
+            'suppliers': [supplier.id] + [s.id for s in suppliers],
+            'products': [p.id for p in products],
+            'movements': [m.id for m in movements]
+        }
 
 
 @pytest.fixture
-def test_session(temp_db):
-    """Create test database session."""
-    session = temp_db()
+def test_session(request, test_engine):
+    """Create test database session, rolled back after each test.
+    
+    The session joins an outer transaction and turns its own commits into
+    SAVEPOINT releases, so tests can commit freely without leaking data.
+    Tests that use seed_data (through the sample_* fixtures) get a session
+    on the seeded database; all others get empty tables.
+    """
+    engine = test_engine
+    if 'seed_data' in request.fixturenames:
+        # Seed before opening the outer transaction on the shared connection
+        request.getfixturevalue('seed_data')
+        engine = request.getfixturevalue('seeded_engine')
+    
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection, autoflush=False, join_transaction_mode="create_savepoint")
     try:
         yield session
     finally:
         session.close()
+        transaction.rollback()
+        connection.close()
 
 
 @pytest.fixture
-def sample_category(test_session):
-    """Create sample category for testing."""
-    category = Category(
-        name="Electronics",
-        description="Electronic devices and accessories"
-    )
-    test_session.add(category)
-    test_session.commit()
-    test_session.refresh(category)
-    return category
+def sample_category(test_session, seed_data):
+    """Sample category from the shared seed data."""
+    return test_session.get(Category, seed_data['category'])
 
 
 @pytest.fixture
-def sample_supplier(test_session):
-    """Create sample supplier for testing."""
-    supplier = Supplier(
-        name="TechCorp Wholesale",
-        contact_email="orders@techcorp.com",
-        contact_phone="1-800-123-4567",
-        address="123 Tech Street, Silicon Valley, CA",
-        tax_id="TAX-123456789",
-        payment_terms="Net 30",
-        is_active=True
-    )
-    test_session.add(supplier)
-    test_session.commit()
-    test_session.refresh(supplier)
-    return supplier
+def sample_supplier(test_session, seed_data):
+    """Sample supplier from the shared seed data."""
+    return test_session.get(Supplier, seed_data['supplier'])
 
 
 @pytest.fixture
-def sample_product(test_session, sample_category, sample_supplier):
-    """Create sample product for testing."""
-    product = Product(
-        sku="ELE-1234-001",
-        name="Wireless Bluetooth Headphones",
-        description="High-quality wireless headphones with noise cancellation",
-        category_id=sample_category.id,
-        supplier_id=sample_supplier.id,
-        cost_price=45.00,
-        wholesale_price=65.00,
-        retail_price=99.99,
-        current_stock=100,
-        minimum_stock=20,
-        maximum_stock=500,
-        weight=0.5,
-        dimensions="20x15x8",
-        barcode="1234567890123",
-        is_active=True,
-        is_discontinued=False
-    )
-    test_session.add(product)
-    test_session.commit()
-    test_session.refresh(product)
-    return product
+def sample_product(test_session, seed_data):
+    """Sample product from the shared seed data."""
+    return test_session.get(Product, seed_data['product'])
 
 
 @pytest.fixture
-def sample_inventory_movement(test_session, sample_product):
-    """Create sample inventory movement for testing."""
-    movement = InventoryMovement(
-        product_id=sample_product.id,
-        movement_type="INBOUND",
-        quantity=50,
-        unit_cost=45.00,
-        reference_number="PO-123456",
-        notes="Initial stock",
-        from_location=None,
-        to_location="Warehouse A"
-    )
-    test_session.add(movement)
-    test_session.commit()
-    test_session.refresh(movement)
-    return movement
+def sample_inventory_movement(test_session, seed_data):
+    """Sample inventory movement from the shared seed data."""
+    return test_session.get(InventoryMovement, seed_data['movement'])
 
 
 @pytest.fixture
-def sample_data(test_session, sample_category, sample_supplier):
-    """Create comprehensive sample data for testing."""
-    # Create additional categories
-    categories = [
-        Category(name="Clothing", description="Apparel and accessories"),
-        Category(name="Home & Garden", description="Home improvement items"),
-    ]
-    for cat in categories:
-        test_session.add(cat)
-    
-    # Create additional suppliers
-    suppliers = [
-        Supplier(
-            name="Fashion Plus",
-            contact_email="orders@fashionplus.com",
-            payment_terms="Net 15",
-            is_active=True
-        ),
-        Supplier(
-            name="Garden Supply Co",
-            contact_email="sales@gardensupply.com",
-            payment_terms="Net 45",
-            is_active=False
-        ),
-    ]
-    for sup in suppliers:
-        test_session.add(sup)
-    
-    test_session.commit()
-    
-    # Create products
-    products = [
-        Product(
-            sku="ELE-1235-001",
-            name="USB-C Cable",
-            category_id=sample_category.id,
-            supplier_id=sample_supplier.id,
-            cost_price=5.00,
-            wholesale_price=8.50,
-            retail_price=14.99,
-            current_stock=5,  # Low stock
-            minimum_stock=20,
-            maximum_stock=200,
-            is_active=True
-        ),
-        Product(
-            sku="CLO-2001-001", 
-            name="Cotton T-Shirt",
-            category_id=categories[0].id,
-            supplier_id=suppliers[0].id,
-            cost_price=8.00,
-            wholesale_price=14.00,
-            retail_price=24.99,
-            current_stock=0,  # Out of stock
-            minimum_stock=10,
-            maximum_stock=100,
-            is_active=True
-        ),
-        Product(
-            sku="HOM-3001-001",
-            name="Garden Hose",
-            category_id=categories[1].id,
-            supplier_id=suppliers[1].id,
-            cost_price=15.00,
-            wholesale_price=25.00,
-            retail_price=39.99,
-            current_stock=200,  # Overstocked
-            minimum_stock=10,
-            maximum_stock=50,
-            is_active=True
-        ),
-    ]
-    
-    for prod in products:
-        test_session.add(prod)
-    
-    test_session.commit()
-    
-    # Create inventory movements
-    movements = [
-        InventoryMovement(
-            product_id=products[0].id,
-            movement_type="OUTBOUND",
-            quantity=-15,
-            reference_number="SO-001"
-        ),
-        InventoryMovement(
-            product_id=products[1].id,
-            movement_type="OUTBOUND", 
-            quantity=-10,
-            reference_number="SO-002"
-        ),
-        InventoryMovement(
-            product_id=products[2].id,
-            movement_type="INBOUND",
-            quantity=150,
-            reference_number="PO-789"
-        ),
-    ]
-    
-    for mov in movements:
-        test_session.add(mov)
-    
-    test_session.commit()
-    
+def sample_data(test_session, seed_data):
+    """Comprehensive sample data from the shared seed rows."""
     return {
-        'categories': [sample_category] + categories,
-        'suppliers': [sample_supplier] + suppliers,
-        'products': products,
-        'movements': movements
+        key: [test_session.get(model, id_) for id_ in seed_data[key]]
+        for key, model in _SAMPLE_DATA_MODELS.items()
     }
 
 
@@ -247,34 +372,39 @@ def mock_llm_response():
     return "This is a mock response from the AI agent."
 
 
+class MockLLMClient:
+    """Stand-in for LLMClient that returns canned responses."""
+    
+    def __init__(self, *args, **kwargs):
+        pass
+    
+    def generate_response(self, prompt, system_prompt=None, history=None):
+        return "Mock AI response based on the provided data."
+    
+    def is_available(self):
+        return True
+    
+    def get_model_info(self):
+        return {
+            'provider': 'mock',
+            'model': 'mock-model',
+            'available': True
+        }
+
+
 @pytest.fixture
 def mock_llm_client(monkeypatch):
     """Mock LLM client for testing."""
-    class MockLLMClient:
-        def __init__(self, *args, **kwargs):
-            pass
-        
-        def generate_response(self, prompt, system_prompt=None):
-            return "Mock AI response based on the provided data."
-        
-        def is_available(self):
-            return True
-        
-        def get_model_info(self):
-            return {
-                'provider': 'mock',
-                'model': 'mock-model',
-                'available': True
-            }
-    
     monkeypatch.setattr('wholesale_agent.core.llm_client.LLMClient', MockLLMClient)
     return MockLLMClient
 
 
-# Pytest markers
-pytest.mark.unit = pytest.mark.unit
-pytest.mark.integration = pytest.mark.integration
-pytest.mark.slow = pytest.mark.slow
+@pytest.fixture(scope="class")
+def class_mock_llm_client():
+    """Mock LLM client kept in place for a whole test class."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr('wholesale_agent.core.llm_client.LLMClient', MockLLMClient)
+        yield MockLLMClient
 
 
 def pytest_configure(config):
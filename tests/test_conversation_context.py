@@ -0,0 +1,161 @@
+"""
+Tests for conversation context tracking and persistence.
+"""
+import json
+import sqlite3
+import pytest
+from unittest.mock import Mock
+
+from wholesale_agent.core.action_executor import ActionResult
+from wholesale_agent.core.conversation_context import ConversationContext
+from wholesale_agent.core.intent_analyzer import IntentAnalyzer, IntentResult
+
+
+def _add_turn(context, query="how many USB cables?", response="We have 25 USB cables in stock.",
+              product="USB Cable"):
+    """Add a successful inventory_query turn that found ``product``."""
+    context.add_turn(
+        query,
+        IntentResult("inventory_query", 0.9, {'product_name': product}, False, raw_query=query),
+        ActionResult(success=True, data=[{'name': product, 'sku': 'ELE-1235-001'}],
+                     action_type="inventory_query"),
+        response
+    )
+
+
+@pytest.mark.unit
+class TestPromptHistory:
+    """Test the chat histories replayed to the LLM."""
+    
+    def test_intent_history_holds_intent_json(self):
+        """Test the classifier history pairs each query with its intent JSON, not prose."""
+        context = ConversationContext()
+        _add_turn(context)
+        
+        messages = context.get_context_for_query("what about its price?")['intent_messages']
+        
+        assert [m['role'] for m in messages] == ['user', 'assistant']
+        assert messages[0]['content'] == "how many USB cables?"
+        intent = json.loads(messages[1]['content'])
+        assert intent['intent_type'] == "inventory_query"
+        assert intent['entities'] == {'product_name': "USB Cable"}
+    
+    def test_response_history_holds_answers(self):
+        """Test the formatter history keeps the prose answers."""
+        context = ConversationContext()
+        _add_turn(context)
+        
+        assert context.get_prompt_messages()[1]['content'] == "We have 25 USB cables in stock."
+    
+    def test_intent_history_resets_when_full(self):
+        """Test the classifier history starts over once max_turns is reached."""
+        context = ConversationContext(max_turns=2)
+        for i in range(3):
+            _add_turn(context, query=f"query {i}")
+        
+        assert [m['content'] for m in context.get_intent_messages()][::2] == ["query 2"]
+    
+    def test_analyzer_sends_intent_history(self):
+        """Test the intent classifier is sent the intent history, not the prose one."""
+        context = ConversationContext()
+        _add_turn(context)
+        llm_client = Mock(spec=['generate_response'])
+        llm_client.generate_response.return_value = '{"intent_type": "price_query"}'
+        
+        IntentAnalyzer(llm_client)._llm_analyze_intent(
+            "what about its price?", context.get_context_for_query("what about its price?")
+        )
+        
+        assert llm_client.generate_response.call_args.kwargs['history'] == context.get_intent_messages()
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Path of a throwaway SQLite context store."""
+    return str(tmp_path / "context.sqlite")
+
+
+def _stored_turns(db_path, user_id):
+    """Count the persisted turns for ``user_id``."""
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(
+            "SELECT COUNT(*) FROM conversation_turns WHERE user_id = ?", (user_id,)
+        ).fetchone()[0]
+
+
+@pytest.mark.unit
+class TestContextPersistence:
+    """Test saving and restoring conversations through the SQLite store."""
+    
+    def test_save_load_round_trip(self, db_path):
+        """Test turn ids, timestamps and mentioned products survive a round trip."""
+        context = ConversationContext()
+        _add_turn(context, query="how many USB cables?", product="USB Cable")
+        _add_turn(context, query="how many garden hoses?", product="Garden Hose")
+        context.save(db_path, user_id="alice")
+        
+        restored = ConversationContext.load(db_path, user_id="alice")
+        
+        assert [t.turn_id for t in restored.history] == [1, 2]
+        assert [t.timestamp for t in restored.history] == [t.timestamp for t in context.history]
+        assert [t.user_query for t in restored.history] == ["how many USB cables?", "how many garden hoses?"]
+        assert list(restored.last_mentioned_products) == ["USB Cable", "Garden Hose"]
+        assert restored.turn_counter == 2
+    
+    def test_save_appends_only_new_turns(self, db_path):
+        """Test turns restored by load() are not written again."""
+        context = ConversationContext()
+        _add_turn(context)
+        context.save(db_path, user_id="alice")
+        
+        restored = ConversationContext.load(db_path, user_id="alice")
+        _add_turn(restored, query="and garden hoses?", product="Garden Hose")
+        restored.save()
+        
+        assert _stored_turns(db_path, "alice") == 2
+        assert [t.turn_id for t in ConversationContext.load(db_path, user_id="alice").history] == [1, 2]
+    
+    def test_unreadable_rows_skipped(self, db_path):
+        """Test rows whose stored intent or action cannot be decoded are skipped."""
+        context = ConversationContext()
+        _add_turn(context, query="how many USB cables?")
+        _add_turn(context, query="how many garden hoses?", product="Garden Hose")
+        _add_turn(context, query="how many t-shirts?", product="Cotton T-Shirt")
+        context.save(db_path, user_id="alice")
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("UPDATE conversation_turns SET intent_json = 'not json' WHERE turn_id = 1")
+            conn.execute("UPDATE conversation_turns SET action_json = '{\"bogus\": 1}' WHERE turn_id = 2")
+        
+        restored = ConversationContext.load(db_path, user_id="alice")
+        
+        assert [t.user_query for t in restored.history] == ["how many t-shirts?"]
+        assert restored.turn_counter == 3
+    
+    def test_users_isolated(self, db_path):
+        """Test each user only restores their own conversation."""
+        alice = ConversationContext()
+        _add_turn(alice, query="alice asks")
+        alice.save(db_path, user_id="alice")
+        bob = ConversationContext()
+        _add_turn(bob, query="bob asks")
+        bob.save(db_path, user_id="bob")
+        
+        assert [t.user_query for t in ConversationContext.load(db_path, user_id="alice").history] == ["alice asks"]
+        assert [t.user_query for t in ConversationContext.load(db_path, user_id="bob").history] == ["bob asks"]
+        assert ConversationContext.load(db_path, user_id="carol").history == []
+    
+    def test_clear_context_deletes_persisted_rows(self, db_path):
+        """Test clearing a conversation removes its stored turns, and only its own."""
+        bob = ConversationContext()
+        _add_turn(bob, query="bob asks")
+        bob.save(db_path, user_id="bob")
+        alice = ConversationContext()
+        _add_turn(alice)
+        alice.save(db_path, user_id="alice")
+        
+        restored = ConversationContext.load(db_path, user_id="alice")
+        restored.clear_context()
+        
+        assert _stored_turns(db_path, "alice") == 0
+        assert _stored_turns(db_path, "bob") == 1
+        assert ConversationContext.load(db_path, user_id="alice").history == []
@@ -1,243 +1,301 @@
 """
 Tests for inventory query functionality.
 """
+import contextlib
 import pytest
-from unittest.mock import patch, MagicMock
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import patch
 
+from wholesale_agent.core import inventory_queries
 from wholesale_agent.core.inventory_queries import InventoryQueryHandler
 
+try:
+    import pytest_benchmark  # noqa: F401
+    BENCHMARK_AVAILABLE = True
+except ImportError:
+    BENCHMARK_AVAILABLE = False
+
+
+class FakeQuery:
+    """Query stand-in whose chaining methods return itself and whose
+    terminal methods return the results preset by the test."""
+    
+    def __init__(self):
+        self.reset()
+    
+    def reset(self):
+        self.first_result = None
+        self.all_result = []
+        self.count_results = []
+    
+    def filter(self, *args, **kwargs):
+        return self
+    
+    join = group_by = order_by = limit = filter
+    
+    def first(self):
+        return self.first_result
+    
+    def all(self):
+        return self.all_result
+    
+    def count(self):
+        return self.count_results.pop(0) if self.count_results else 0
+
+
+class FakeSession:
+    """Session stand-in that hands out a single shared FakeQuery."""
+    
+    def __init__(self, query):
+        self._query = query
+    
+    def query(self, *args, **kwargs):
+        return self._query
+
+
+_FAKE_QUERY = FakeQuery()
+
+# Category and supplier shared by the product stubs
+_ELECTRONICS = SimpleNamespace(name="Electronics")
+_TECHCORP = SimpleNamespace(name="TechCorp")
+
+
+@pytest.fixture(autouse=True, scope="module")
+def _patch_db():
+    """Route every handler session in this module to the shared FakeSession."""
+    session = FakeSession(_FAKE_QUERY)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(inventory_queries.db_manager, 'get_session',
+                   lambda: contextlib.nullcontext(session))
+        yield
+
+
+@pytest.fixture(autouse=True)
+def fake_query():
+    """The shared FakeQuery, cleared of results from earlier tests."""
+    _FAKE_QUERY.reset()
+    return _FAKE_QUERY
+
+
+@pytest.fixture(scope="class")
+def handler():
+    """Create an inventory query handler instance shared by each test class."""
+    return InventoryQueryHandler()
+
+
+@pytest.fixture(scope="class")
+def low_stock_result(handler):
+    """Run get_low_stock_products once per test class."""
+    _FAKE_QUERY.reset()
+    _FAKE_QUERY.all_result = [
+        SimpleNamespace(
+            sku=f"LOW-{i+1:04d}-001",
+            name=f"Low Stock Product {i+1}",
+            current_stock=5,
+            minimum_stock=20,
+            category=_ELECTRONICS,
+            supplier=_TECHCORP,
+            wholesale_price=10.0,
+            cost_price=8.0
+        )
+        for i in range(3)
+    ]
+    return handler.get_low_stock_products(limit=10)
+
+
+@pytest.fixture(scope="class")
+def out_of_stock_result(handler):
+    """Run get_out_of_stock_products once per test class."""
+    _FAKE_QUERY.reset()
+    _FAKE_QUERY.all_result = [
+        SimpleNamespace(
+            sku=f"OUT-{i+1:04d}-001",
+            name=f"Out of Stock Product {i+1}",
+            current_stock=0,
+            category=_ELECTRONICS,
+            supplier=_TECHCORP,
+            minimum_stock=10,
+            wholesale_price=15.0,
+            cost_price=12.0
+        )
+        for i in range(2)
+    ]
+    return handler.get_out_of_stock_products()
+
 
 @pytest.mark.integration
 class TestInventoryQueryHandler:
     """Test InventoryQueryHandler functionality."""
     
-    @pytest.fixture
-    def handler(self):
-        """Create inventory query handler instance."""
-        return InventoryQueryHandler()
-    
-    def test_get_product_stock_found(self, handler, sample_data):
+    def test_get_product_stock_found(self, handler, sample_data, fake_query):
         """Test getting stock for existing product."""
-        # Mock the database session
-        with patch('wholesale_agent.core.inventory_queries.db_manager.get_session') as mock_session:
-            mock_session.return_value.__enter__.return_value = MagicMock()
-            session = mock_session.return_value.__enter__.return_value
-            
-            # Mock product query result
-            mock_product = MagicMock()
-            mock_product.id = 1
-            mock_product.sku = "ELE-1234-001"
-            mock_product.name = "Wireless Bluetooth Headphones"
-            mock_product.current_stock = 100
-            mock_product.minimum_stock = 20
-            mock_product.maximum_stock = 500
-            mock_product.stock_status = "IN_STOCK"
-            mock_product.is_low_stock = False
-            mock_product.category.name = "Electronics"
-            mock_product.supplier.name = "TechCorp"
-            mock_product.cost_price = 45.0
-            mock_product.wholesale_price = 65.0
-            mock_product.retail_price = 99.99
-            
-            session.query.return_value.filter.return_value.first.return_value = mock_product
-            session.query.return_value.filter.return_value.order_by.return_value.limit.return_value.all.return_value = []
-            
-            result = handler.get_product_stock("wireless headphones")
-            
-            assert result['found'] is True
-            assert result['product']['sku'] == "ELE-1234-001"
-            assert result['product']['current_stock'] == 100
-            assert result['product']['stock_status'] == "IN_STOCK"
+        # Mock product query result
+        mock_product = SimpleNamespace(
+            id=1,
+            sku="ELE-1234-001",
+            name="Wireless Bluetooth Headphones",
+            current_stock=100,
+            minimum_stock=20,
+            maximum_stock=500,
+            stock_status="IN_STOCK",
+            is_low_stock=False,
+            category=_ELECTRONICS,
+            supplier=_TECHCORP,
+            cost_price=45.0,
+            wholesale_price=65.0,
+            retail_price=99.99
+        )
+        
+        fake_query.first_result = mock_product
+        fake_query.all_result = []
+        
+        result = handler.get_product_stock("wireless headphones")
+        
+        assert result['found'] is True
+        assert result['product']['sku'] == "ELE-1234-001"
+        assert result['product']['current_stock'] == 100
+        assert result['product']['stock_status'] == "IN_STOCK"
     
-    def test_get_product_stock_not_found(self, handler):
+    def test_get_product_stock_not_found(self, handler, fake_query):
         """Test getting stock for non-existing product."""
-        with patch('wholesale_agent.core.inventory_queries.db_manager.get_session') as mock_session:
-            mock_session.return_value.__enter__.return_value = MagicMock()
-            session = mock_session.return_value.__enter__.return_value
-            
-            session.query.return_value.filter.return_value.first.return_value = None
-            
-            result = handler.get_product_stock("nonexistent product")
-            
-            assert result['found'] is False
-            assert 'message' in result
+        fake_query.first_result = None
+        
+        result = handler.get_product_stock("nonexistent product")
+        
+        assert result['found'] is False
+        assert 'message' in result
     
-    def test_get_low_stock_products(self, handler):
+    def test_get_low_stock_products(self, low_stock_result):
         """Test getting low stock products."""
-        with patch('wholesale_agent.core.inventory_queries.db_manager.get_session') as mock_session:
-            mock_session.return_value.__enter__.return_value = MagicMock()
-            session = mock_session.return_value.__enter__.return_value
-            
-            # Mock low stock products
-            mock_products = []
-            for i in range(3):
-                mock_product = MagicMock()
-                mock_product.sku = f"LOW-{i+1:04d}-001"
-                mock_product.name = f"Low Stock Product {i+1}"
-                mock_product.current_stock = 5
-                mock_product.minimum_stock = 20
-                mock_product.category.name = "Electronics"
-                mock_product.supplier.name = "TechCorp"
-                mock_product.wholesale_price = 10.0
-                mock_product.cost_price = 8.0
-                mock_products.append(mock_product)
-            
-            session.query.return_value.filter.return_value.order_by.return_value.limit.return_value.all.return_value = mock_products
-            
-            result = handler.get_low_stock_products(limit=10)
-            
-            assert result['count'] == 3
-            assert len(result['products']) == 3
-            
-            for i, product in enumerate(result['products']):
-                assert product['sku'] == f"LOW-{i+1:04d}-001"
-                assert product['current_stock'] == 5
-                assert product['minimum_stock'] == 20
-                assert product['stock_deficit'] == 15  # 20 - 5
+        assert low_stock_result['count'] == 3
+        assert len(low_stock_result['products']) == 3
+    
+    @pytest.mark.parametrize("i", range(3))
+    def test_low_stock_product_fields(self, low_stock_result, i):
+        """Test each low stock product's fields."""
+        product = low_stock_result['products'][i]
+        assert product['sku'] == f"LOW-{i+1:04d}-001"
+        assert product['current_stock'] == 5
+        assert product['minimum_stock'] == 20
+        assert product['stock_deficit'] == 15  # 20 - 5
     
-    def test_get_out_of_stock_products(self, handler):
+    def test_get_out_of_stock_products(self, out_of_stock_result):
         """Test getting out of stock products."""
-        with patch('wholesale_agent.core.inventory_queries.db_manager.get_session') as mock_session:
-            mock_session.return_value.__enter__.return_value = MagicMock()
-            session = mock_session.return_value.__enter__.return_value
-            
-            # Mock out of stock products
-            mock_products = []
-            for i in range(2):
-                mock_product = MagicMock()
-                mock_product.sku = f"OUT-{i+1:04d}-001"
-                mock_product.name = f"Out of Stock Product {i+1}"
-                mock_product.current_stock = 0
-                mock_product.category.name = "Electronics"
-                mock_product.supplier.name = "TechCorp"
-                mock_product.minimum_stock = 10
-                mock_product.wholesale_price = 15.0
-                mock_product.cost_price = 12.0
-                mock_products.append(mock_product)
-            
-            session.query.return_value.filter.return_value.order_by.return_value.limit.return_value.all.return_value = mock_products
-            
-            result = handler.get_out_of_stock_products()
-            
-            assert result['count'] == 2
-            assert len(result['products']) == 2
-            
-            for product in result['products']:
-                assert product['current_stock'] == 0  # Implicitly tested by being out of stock
-                assert product['reorder_value'] == 120.0  # 10 * 12.0
+        assert out_of_stock_result['count'] == 2
+        assert len(out_of_stock_result['products']) == 2
     
-    def test_get_inventory_value(self, handler):
+    @pytest.mark.parametrize("i", range(2))
+    def test_out_of_stock_product_fields(self, out_of_stock_result, i):
+        """Test each out of stock product's fields."""
+        product = out_of_stock_result['products'][i]
+        assert product['current_stock'] == 0  # Implicitly tested by being out of stock
+        assert product['reorder_value'] == 120.0  # 10 * 12.0
+    
+    def test_get_inventory_value(self, handler, fake_query):
         """Test calculating inventory value."""
-        with patch('wholesale_agent.core.inventory_queries.db_manager.get_session') as mock_session:
-            mock_session.return_value.__enter__.return_value = MagicMock()
-            session = mock_session.return_value.__enter__.return_value
-            
-            # Mock aggregate query result
-            mock_result = MagicMock()
-            mock_result.total_products = 100
-            mock_result.total_units = 5000
-            mock_result.cost_value = 25000.0
-            mock_result.wholesale_value = 35000.0
-            mock_result.retail_value = 50000.0
-            
-            session.query.return_value.filter.return_value.first.return_value = mock_result
-            
-            # Mock category breakdown
-            mock_category_data = []
-            categories = ["Electronics", "Clothing", "Home & Garden"]
-            for i, cat in enumerate(categories):
-                mock_cat = MagicMock()
-                mock_cat.name = cat
-                mock_cat.product_count = 30 + i * 10
-                mock_cat.total_units = 1000 + i * 500
-                mock_cat.category_value = 8000.0 + i * 2000
-                mock_category_data.append(mock_cat)
-            
-            session.query.return_value.join.return_value.filter.return_value.group_by.return_value.order_by.return_value.all.return_value = mock_category_data
-            
-            result = handler.get_inventory_value()
-            
-            assert result['summary']['total_products'] == 100
-            assert result['summary']['cost_value'] == 25000.0
-            assert result['summary']['potential_markup'] == 25000.0  # 50000 - 25000
-            
-            assert len(result['by_category']) == 3
-            assert result['by_category'][0]['category'] == "Electronics"
+        # Mock aggregate query result
+        mock_result = SimpleNamespace(
+            total_products=100,
+            total_units=5000,
+            cost_value=25000.0,
+            wholesale_value=35000.0,
+            retail_value=50000.0
+        )
+        
+        fake_query.first_result = mock_result
+        
+        # Mock category breakdown
+        categories = ["Electronics", "Clothing", "Home & Garden"]
+        mock_category_data = [
+            SimpleNamespace(
+                name=cat,
+                product_count=30 + i * 10,
+                total_units=1000 + i * 500,
+                category_value=8000.0 + i * 2000
+            )
+            for i, cat in enumerate(categories)
+        ]
+        
+        fake_query.all_result = mock_category_data
+        
+        result = handler.get_inventory_value()
+        
+        assert result['summary']['total_products'] == 100
+        assert result['summary']['cost_value'] == 25000.0
+        assert result['summary']['potential_markup'] == 25000.0  # 50000 - 25000
+        
+        assert len(result['by_category']) == 3
+        assert result['by_category'][0]['category'] == "Electronics"
     
-    def test_get_movement_history(self, handler):
+    def test_get_movement_history(self, handler, fake_query):
         """Test getting inventory movement history."""
-        with patch('wholesale_agent.core.inventory_queries.db_manager.get_session') as mock_session:
-            mock_session.return_value.__enter__.return_value = MagicMock()
-            session = mock_session.return_value.__enter__.return_value
-            
-            # Mock movement data
-            mock_movements = []
-            movement_types = ['INBOUND', 'OUTBOUND', 'ADJUSTMENT']
-            quantities = [50, -20, 5]
-            
-            for i, (mov_type, qty) in enumerate(zip(movement_types, quantities)):
-                mock_movement = MagicMock()
-                mock_movement.id = i + 1
-                mock_movement.created_at.strftime.return_value = f"2024-01-{i+1:02d} 10:00"
-                mock_movement.product.name = f"Test Product {i+1}"
-                mock_movement.product.sku = f"TST-{i+1:04d}-001"
-                mock_movement.movement_type = mov_type
-                mock_movement.quantity = qty
-                mock_movement.unit_cost = 10.0 if mov_type == 'INBOUND' else None
-                mock_movement.reference_number = f"REF-{i+1:03d}"
-                mock_movement.notes = f"Test movement {i+1}"
-                mock_movements.append(mock_movement)
-            
-            session.query.return_value.filter.return_value.order_by.return_value.limit.return_value.all.return_value = mock_movements
-            
-            result = handler.get_movement_history(days=30)
-            
-            assert result['period'] == "Last 30 days"
-            assert result['statistics']['total_movements'] == 3
-            assert result['statistics']['inbound_quantity'] == 55  # 50 + 5
-            assert result['statistics']['outbound_quantity'] == 20  # abs(-20)
-            assert result['statistics']['net_change'] == 35  # 55 - 20
-            
-            assert len(result['movements']) == 3
-            assert result['movements'][0]['movement_type'] == 'INBOUND'
+        # Mock movement data
+        movement_types = ['INBOUND', 'OUTBOUND', 'ADJUSTMENT']
+        quantities = [50, -20, 5]
+        
+        mock_movements = [
+            SimpleNamespace(
+                id=i + 1,
+                created_at=datetime(2024, 1, i + 1, 10, 0),
+                product=SimpleNamespace(name=f"Test Product {i+1}", sku=f"TST-{i+1:04d}-001"),
+                movement_type=mov_type,
+                quantity=qty,
+                unit_cost=10.0 if mov_type == 'INBOUND' else None,
+                reference_number=f"REF-{i+1:03d}",
+                notes=f"Test movement {i+1}"
+            )
+            for i, (mov_type, qty) in enumerate(zip(movement_types, quantities))
+        ]
+        
+        fake_query.all_result = mock_movements
+        
+        result = handler.get_movement_history(days=30)
+        
+        assert result['period'] == "Last 30 days"
+        assert result['statistics']['total_movements'] == 3
+        assert result['statistics']['inbound_quantity'] == 55  # 50 + 5
+        assert result['statistics']['outbound_quantity'] == 20  # abs(-20)
+        assert result['statistics']['net_change'] == 35  # 55 - 20
+        
+        assert len(result['movements']) == 3
+        assert result['movements'][0]['movement_type'] == 'INBOUND'
+        assert result['movements'][0]['date'] == "2024-01-01 10:00"
     
-    def test_get_inventory_summary(self, handler):
+    def test_get_inventory_summary(self, handler, fake_query):
         """Test getting comprehensive inventory summary."""
-        with patch('wholesale_agent.core.inventory_queries.db_manager.get_session') as mock_session:
-            mock_session.return_value.__enter__.return_value = MagicMock()
-            session = mock_session.return_value.__enter__.return_value
-            
-            # Mock various count queries
-            session.query.return_value.filter.return_value.count.side_effect = [
-                100,  # total_products
-                10,   # total_categories  
-                15,   # total_suppliers
-                20,   # low_stock_count
-                5,    # out_of_stock_count
-                3,    # overstocked_count
-                25,   # recent_movements
-                2     # inactive_suppliers
-            ]
-            
-            # Mock inventory value calculation
-            with patch.object(handler, 'get_inventory_value') as mock_get_value:
-                mock_get_value.return_value = {
-                    'summary': {'cost_value': 75000.0}
-                }
-                
-                result = handler.get_inventory_summary()
-            
-            assert result['overview']['total_products'] == 100
-            assert result['overview']['inventory_value'] == 75000.0
-            
-            assert result['stock_status']['in_stock'] == 75  # 100 - 20 - 5
-            assert result['stock_status']['low_stock'] == 20
-            assert result['stock_status']['out_of_stock'] == 5
-            assert result['stock_status']['overstocked'] == 3
+        # Count query results, in the order the handler issues them
+        counts = {
+            'total_products': 100,
+            'total_categories': 10,
+            'total_suppliers': 15,
+            'low_stock_count': 20,
+            'out_of_stock_count': 5,
+            'overstocked_count': 3,
+            'recent_movements': 25,
+            'inactive_suppliers': 2,
+        }
+        fake_query.count_results = list(counts.values())
+        
+        # Mock inventory value calculation
+        with patch.object(handler, 'get_inventory_value') as mock_get_value:
+            mock_get_value.return_value = {
+                'summary': {'cost_value': 75000.0}
+            }
             
-            assert result['alerts']['needs_reorder'] == 25  # 20 + 5
-            assert result['alerts']['excess_inventory'] == 3
-            assert result['alerts']['inactive_suppliers'] == 2
+            result = handler.get_inventory_summary()
+        
+        assert result['overview']['total_products'] == 100
+        assert result['overview']['inventory_value'] == 75000.0
+        
+        assert result['stock_status']['in_stock'] == 75  # 100 - 20 - 5
+        assert result['stock_status']['low_stock'] == 20
+        assert result['stock_status']['out_of_stock'] == 5
+        assert result['stock_status']['overstocked'] == 3
+        
+        assert result['alerts']['needs_reorder'] == 25  # 20 + 5
+        assert result['alerts']['excess_inventory'] == 3
+        assert result['alerts']['inactive_suppliers'] == 2
     
     def test_execute_query_valid_type(self, handler):
         """Test executing a valid query type."""
@@ -251,68 +309,97 @@ class TestInventoryQueryHandler:
     
     def test_execute_query_invalid_type(self, handler):
         """Test executing an invalid query type."""
-        with pytest.raises(ValueError) as exc_info:
+        with pytest.raises(ValueError, match="Unknown query type"):
             handler.execute_query('invalid_query_type')
-        
-        assert "Unknown query type" in str(exc_info.value)
 
 
 @pytest.mark.unit
 class TestInventoryQueryMethods:
     """Test individual query methods with mocked data."""
     
-    @pytest.fixture
-    def handler(self):
-        """Create handler instance."""
-        return InventoryQueryHandler()
-    
-    def test_stock_forecast_with_data(self, handler):
+    def test_stock_forecast_with_data(self, handler, fake_query):
         """Test stock forecast calculation with movement data."""
-        with patch('wholesale_agent.core.inventory_queries.db_manager.get_session') as mock_session:
-            mock_session.return_value.__enter__.return_value = MagicMock()
-            session = mock_session.return_value.__enter__.return_value
-            
-            # Mock product
-            mock_product = MagicMock()
-            mock_product.name = "Test Product"
-            mock_product.current_stock = 100
-            mock_product.minimum_stock = 20
-            
-            session.query.return_value.filter.return_value.first.return_value = mock_product
-            
-            # Mock outbound movements (simulating sales)
-            mock_movements = []
-            for i in range(10):  # 10 sales movements
-                mock_movement = MagicMock()
-                mock_movement.quantity = -5  # 5 units sold each time
-                mock_movements.append(mock_movement)
-            
-            session.query.return_value.filter.return_value.all.return_value = mock_movements
-            
-            result = handler.get_stock_forecast("test product", days=30)
-            
-            assert result['found'] is True
-            assert result['avg_daily_consumption'] > 0
-            assert 'projected_stock_in_30_days' in result
-            assert 'recommendation' in result
-            assert 'forecast_confidence' in result
+        # Mock product
+        mock_product = SimpleNamespace(id=1, name="Test Product", current_stock=100, minimum_stock=20)
+        
+        fake_query.first_result = mock_product
+        
+        # Mock outbound movements (simulating sales)
+        mock_movements = [
+            SimpleNamespace(quantity=-5)  # 5 units sold each time
+            for i in range(10)  # 10 sales movements
+        ]
+        
+        fake_query.all_result = mock_movements
+        
+        result = handler.get_stock_forecast("test product", days=30)
+        
+        assert result['found'] is True
+        assert result['avg_daily_consumption'] > 0
+        assert 'projected_stock_in_30_days' in result
+        assert 'recommendation' in result
+        assert 'forecast_confidence' in result
     
-    def test_stock_forecast_no_data(self, handler):
+    def test_stock_forecast_no_data(self, handler, fake_query):
         """Test stock forecast with no movement data."""
-        with patch('wholesale_agent.core.inventory_queries.db_manager.get_session') as mock_session:
-            mock_session.return_value.__enter__.return_value = MagicMock()
-            session = mock_session.return_value.__enter__.return_value
-            
-            # Mock product
-            mock_product = MagicMock()
-            mock_product.name = "Test Product"
-            mock_product.current_stock = 100
-            
-            session.query.return_value.filter.return_value.first.return_value = mock_product
-            session.query.return_value.filter.return_value.all.return_value = []  # No movements
-            
-            result = handler.get_stock_forecast("test product")
-            
-            assert result['found'] is True
-            assert result['forecast'] == 'Insufficient data for forecast'
-            assert 'No recent sales data' in result['recommendation']
\ No newline at end of file
+        # Mock product
+        mock_product = SimpleNamespace(id=1, name="Test Product", current_stock=100)
+        
+        fake_query.first_result = mock_product
+        fake_query.all_result = []  # No movements
+        
+        result = handler.get_stock_forecast("test product")
+        
+        assert result['found'] is True
+        assert result['forecast'] == 'Insufficient data for forecast'
+        assert 'No recent sales data' in result['recommendation']
+
+
+@pytest.mark.slow
+@pytest.mark.skipif(not BENCHMARK_AVAILABLE, reason="pytest-benchmark not installed")
+class TestInventoryQueryBenchmarks:
+    """Timing of the stock report handlers as the result set grows."""
+    
+    @pytest.mark.benchmark(group="low_stock")
+    @pytest.mark.parametrize("n", [10, 100, 1000])
+    def test_low_stock_products_benchmark(self, benchmark, handler, fake_query, n):
+        """Benchmark get_low_stock_products over n products."""
+        fake_query.all_result = [
+            SimpleNamespace(
+                sku=f"LOW-{i+1:04d}-001",
+                name=f"Low Stock Product {i+1}",
+                current_stock=5,
+                minimum_stock=20,
+                category=_ELECTRONICS,
+                supplier=_TECHCORP,
+                wholesale_price=10.0,
+                cost_price=8.0
+            )
+            for i in range(n)
+        ]
+        
+        result = benchmark(handler.get_low_stock_products, limit=n)
+        
+        assert result['count'] == n
+    
+    @pytest.mark.benchmark(group="out_of_stock")
+    @pytest.mark.parametrize("n", [10, 100, 1000])
+    def test_out_of_stock_products_benchmark(self, benchmark, handler, fake_query, n):
+        """Benchmark get_out_of_stock_products over n products."""
+        fake_query.all_result = [
+            SimpleNamespace(
+                sku=f"OUT-{i+1:04d}-001",
+                name=f"Out of Stock Product {i+1}",
+                current_stock=0,
+                category=_ELECTRONICS,
+                supplier=_TECHCORP,
+                minimum_stock=10,
+                wholesale_price=15.0,
+                cost_price=12.0
+            )
+            for i in range(n)
+        ]
+        
+        result = benchmark(handler.get_out_of_stock_products, limit=n)
+        
+        assert result['count'] == n
@@ -0,0 +1,69 @@
+"""
+Tests for the direct inventory management script.
+"""
+import json
+import pytest
+from contextlib import nullcontext
+from unittest.mock import patch
+
+from scripts import manage_inventory
+from scripts.manage_inventory import run_batch
+from wholesale_agent.core.inventory_manager import InventoryManager
+from wholesale_agent.models import Product
+
+
+@pytest.fixture
+def manager(test_session):
+    """InventoryManager whose sessions are the rolled-back test session."""
+    with patch('wholesale_agent.core.inventory_manager.db_manager.get_session',
+               side_effect=lambda: nullcontext(test_session)):
+        yield InventoryManager()
+
+
+@pytest.mark.integration
+class TestRunBatch:
+    """Test JSON-lines batch operations."""
+    
+    def test_failing_line_rolls_back_earlier_lines(self, manager, test_session, sample_product):
+        """Test a failure part-way through undoes the lines already applied."""
+        lines = [
+            json.dumps({'op': 'add', 'product_identifier': sample_product.sku, 'quantity': 5}),
+            json.dumps({'op': 'remove', 'product_identifier': 'NO-SUCH-SKU', 'quantity': 1}),
+        ]
+        
+        assert run_batch(manager, lines) is False
+        
+        assert test_session.get(Product, sample_product.id).current_stock == 100
+    
+    def test_batch_commits(self, manager, test_session, sample_product):
+        """Test a batch of valid lines is applied."""
+        lines = [json.dumps({'op': 'add', 'product_identifier': sample_product.sku, 'quantity': 5})]
+        
+        assert run_batch(manager, lines) is True
+        
+        assert test_session.get(Product, sample_product.id).current_stock == 105
+    
+    @pytest.mark.parametrize("line,error", [
+        ('[1, 2]', "line 1: expected a JSON object"),
+        ('{"op": "add",', "line 1: invalid JSON"),
+        ('{"op": "explode"}', "line 1: unknown operation 'explode'"),
+    ], ids=['not_object', 'invalid_json', 'unknown_op'])
+    def test_bad_line_aborts(self, manager, capsys, line, error):
+        """Test malformed lines abort the batch with the line number instead of a traceback."""
+        assert run_batch(manager, [line]) is False
+        
+        assert error in capsys.readouterr().out
+
+
+@pytest.mark.unit
+def test_main_batch_failure_exits_nonzero(monkeypatch, tmp_path):
+    """Test a rolled-back batch makes the script exit with status 1."""
+    batch_file = tmp_path / "ops.jsonl"
+    batch_file.write_text('[1, 2]\n')
+    monkeypatch.setattr('sys.argv', ['manage_inventory.py', 'batch', '--file', str(batch_file)])
+    
+    with patch.object(manage_inventory, 'InventoryManager'), \
+            pytest.raises(SystemExit) as exc_info:
+        manage_inventory.main()
+    
+    assert exc_info.value.code == 1
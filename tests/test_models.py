@@ -3,8 +3,9 @@ Tests for database models.
 """
 import pytest
 from datetime import datetime
+from sqlalchemy import func, select
 
-from wholesale_agent.models import Category, Supplier, Product, InventoryMovement
+from wholesale_agent.models import Category, Supplier, Product, InventoryMovement, DatabaseManager
 
 
 @pytest.mark.unit
@@ -189,24 +190,25 @@ class TestInventoryMovement:
         assert str(sample_inventory_movement.product_id) in repr_str
         assert sample_inventory_movement.movement_type in repr_str
     
-    def test_movement_types(self, test_session, sample_product):
+    def test_movement_types(self, test_session, sample_product, sample_inventory_movement):
         """Test different movement types."""
         movement_types = ['INBOUND', 'OUTBOUND', 'ADJUSTMENT', 'RETURN', 'DAMAGED']
         
-        for movement_type in movement_types:
-            movement = InventoryMovement(
+        movements = [
+            InventoryMovement(
                 product_id=sample_product.id,
                 movement_type=movement_type,
                 quantity=10 if movement_type in ['INBOUND', 'RETURN'] else -10,
                 reference_number=f"REF-{movement_type}"
             )
-            test_session.add(movement)
-        
+            for movement_type in movement_types
+        ]
+        test_session.bulk_save_objects(movements)
         test_session.commit()
         
         # Verify all movements were created
-        movements = test_session.query(InventoryMovement).filter(
-            InventoryMovement.product_id == sample_product.id
+        movements = test_session.scalars(
+            select(InventoryMovement).where(InventoryMovement.product_id == sample_product.id)
         ).all()
         
         # +1 for the movement created by sample_inventory_movement fixture
@@ -239,25 +241,17 @@ class TestModelIntegration:
             maximum_stock=50
         )
         test_session.add(product)
-        test_session.commit()
+        test_session.flush()
         
-        # Initial stock receipt
-        inbound = InventoryMovement(
-            product_id=product.id,
-            movement_type="INBOUND",
-            quantity=30,
-            unit_cost=20.0,
-            reference_number="PO-001"
-        )
-        test_session.add(inbound)
-        test_session.commit()
-        
-        # Update product stock
-        product.current_stock += inbound.quantity
-        test_session.commit()
-        
-        # Sales
-        sales = [
+        # Initial stock receipt followed by two sales, recorded together
+        movements = [
+            InventoryMovement(
+                product_id=product.id,
+                movement_type="INBOUND",
+                quantity=30,
+                unit_cost=20.0,
+                reference_number="PO-001"
+            ),
             InventoryMovement(
                 product_id=product.id,
                 movement_type="OUTBOUND",
@@ -271,36 +265,62 @@ class TestModelIntegration:
                 reference_number="SO-002"
             )
         ]
+        test_session.add_all(movements)
         
-        for sale in sales:
-            test_session.add(sale)
-            product.current_stock += sale.quantity  # Negative quantity
-        
+        # Update product stock (sales have negative quantities)
+        product.current_stock += sum(movement.quantity for movement in movements)
         test_session.commit()
         
-        # Verify final state
-        test_session.refresh(product)
+        # Verify final state (the commit expired product, so this reloads it)
         assert product.current_stock == 15  # 30 - 5 - 10
         assert product.stock_status == "IN_STOCK"
         
         # Check movement history
-        movements = test_session.query(InventoryMovement).filter(
-            InventoryMovement.product_id == product.id
-        ).order_by(InventoryMovement.created_at).all()
+        movements = test_session.scalars(
+            select(InventoryMovement)
+            .where(InventoryMovement.product_id == product.id)
+            .order_by(InventoryMovement.created_at, InventoryMovement.id)
+        ).all()
         
         assert len(movements) == 3
         assert movements[0].movement_type == "INBOUND"
         assert movements[1].movement_type == "OUTBOUND"
         assert movements[2].movement_type == "OUTBOUND"
     
-    def test_category_product_aggregation(self, sample_data):
+    def test_category_product_aggregation(self, test_session, sample_data):
         """Test aggregating products by category."""
-        # This would typically be done with a query in the service layer
-        # Here we're just testing that the relationships work
         electronics_category = sample_data['categories'][0]  # Electronics
         
         electronics_products = [p for p in electronics_category.products if p.is_active]
         assert len(electronics_products) >= 1
         
-        total_value = sum(p.current_stock * p.cost_price for p in electronics_products)
-        assert total_value > 0
\ No newline at end of file
+        # Aggregate in SQL, the way the service layer does
+        total_value = test_session.scalar(
+            select(func.sum(Product.current_stock * Product.cost_price)).where(
+                Product.category_id == electronics_category.id,
+                Product.is_active == True
+            )
+        )
+        assert total_value > 0
+
+
+@pytest.mark.unit
+class TestDatabaseManager:
+    """Test database manager connection handling."""
+    
+    def test_warmup_fills_pool(self, tmp_path):
+        """Test warmup leaves the requested connections open in the pool."""
+        manager = DatabaseManager(f"sqlite:///{tmp_path / 'warmup.db'}")
+        try:
+            manager.warmup(3)
+            assert manager.engine.pool.checkedin() == 3
+        finally:
+            manager.engine.dispose()
+    
+    def test_warmup_static_pool(self):
+        """Test warmup is a no-op for the shared in-memory connection."""
+        manager = DatabaseManager("sqlite://")
+        try:
+            manager.warmup()
+        finally:
+            manager.engine.dispose()
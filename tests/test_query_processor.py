@@ -2,162 +2,161 @@
 Tests for query processor functionality.
 """
 import pytest
+from unittest.mock import patch
 
 from wholesale_agent.core.query_processor import QueryProcessor
 
 
+@pytest.fixture(scope="module")
+def processor():
+    """Create query processor instance shared by the module."""
+    return QueryProcessor()
+
+
 @pytest.mark.unit
 class TestQueryProcessor:
     """Test QueryProcessor functionality."""
     
-    @pytest.fixture
-    def processor(self):
-        """Create query processor instance."""
-        return QueryProcessor()
-    
-    def test_inventory_query_classification(self, processor):
+    @pytest.mark.parametrize("query,expected_intent", [
+        ("How much stock do we have?", "inventory_query"),
+        ("What is the current stock level?", "inventory_query"),
+        ("How many USB cables are in stock?", "inventory_query"),
+        ("Show me low stock products", "inventory_query"),
+        ("Which products are out of stock?", "inventory_query"),
+    ])
+    def test_inventory_query_classification(self, processor, query, expected_intent):
         """Test classification of inventory queries."""
-        test_cases = [
-            ("How much stock do we have?", "inventory_query"),
-            ("What is the current stock level?", "inventory_query"),
-            ("How many USB cables are in stock?", "inventory_query"),
-            ("Show me low stock products", "inventory_query"),
-            ("Which products are out of stock?", "inventory_query"),
-        ]
-        
-        for query, expected_intent in test_cases:
-            result = processor.analyze_intent(query)
-            assert result['type'] == expected_intent, f"Failed for query: {query}"
+        result = processor.analyze_intent(query)
+        assert result['type'] == expected_intent
     
-    def test_product_search_classification(self, processor):
+    @pytest.mark.parametrize("query,expected_intent", [
+        ("Find wireless headphones", "product_search"),
+        ("Search for USB cables", "product_search"),
+        ("Show me products in electronics category", "product_search"),
+        ("Look for bluetooth speakers", "product_search"),
+        ("What products do we have?", "product_search"),
+    ])
+    def test_product_search_classification(self, processor, query, expected_intent):
         """Test classification of product search queries."""
-        test_cases = [
-            ("Find wireless headphones", "product_search"),
-            ("Search for USB cables", "product_search"),
-            ("Show me products in electronics category", "product_search"),
-            ("Look for bluetooth speakers", "product_search"),
-            ("What products do we have?", "product_search"),
-        ]
-        
-        for query, expected_intent in test_cases:
-            result = processor.analyze_intent(query)
-            assert result['type'] == expected_intent, f"Failed for query: {query}"
+        result = processor.analyze_intent(query)
+        assert result['type'] == expected_intent
     
-    def test_analytics_query_classification(self, processor):
+    @pytest.mark.parametrize("query,expected_intent", [
+        ("Show me top selling products", "analytics"),
+        ("What are our total sales?", "analytics"),
+        ("Revenue report for last month", "analytics"),
+        ("Analytics on product performance", "analytics"),
+        ("Show statistics for electronics", "analytics"),
+    ])
+    def test_analytics_query_classification(self, processor, query, expected_intent):
         """Test classification of analytics queries."""
-        test_cases = [
-            ("Show me top selling products", "analytics"),
-            ("What are our total sales?", "analytics"),
-            ("Revenue report for last month", "analytics"),
-            ("Analytics on product performance", "analytics"),
-            ("Show statistics for electronics", "analytics"),
-        ]
-        
-        for query, expected_intent in test_cases:
-            result = processor.analyze_intent(query)
-            assert result['type'] == expected_intent, f"Failed for query: {query}"
+        result = processor.analyze_intent(query)
+        assert result['type'] == expected_intent
     
-    def test_supplier_query_classification(self, processor):
+    @pytest.mark.parametrize("query,expected_intent", [
+        ("Who supplies wireless headphones?", "supplier_query"),
+        ("Show me all suppliers", "supplier_query"),
+        ("Contact information for TechCorp", "supplier_query"),
+        ("Which vendor provides USB cables?", "supplier_query"),
+    ])
+    def test_supplier_query_classification(self, processor, query, expected_intent):
         """Test classification of supplier queries."""
-        test_cases = [
-            ("Who supplies wireless headphones?", "supplier_query"),
-            ("Show me all suppliers", "supplier_query"),
-            ("Contact information for TechCorp", "supplier_query"),
-            ("Which vendor provides USB cables?", "supplier_query"),
-        ]
-        
-        for query, expected_intent in test_cases:
-            result = processor.analyze_intent(query)
-            assert result['type'] == expected_intent, f"Failed for query: {query}"
+        result = processor.analyze_intent(query)
+        assert result['type'] == expected_intent
     
-    def test_price_query_classification(self, processor):
+    @pytest.mark.parametrize("query,expected_intent", [
+        ("What is the price of wireless headphones?", "price_query"),
+        ("How much does USB cable cost?", "price_query"),
+        ("Show me wholesale prices", "price_query"),
+        ("What are the retail prices?", "price_query"),
+    ])
+    def test_price_query_classification(self, processor, query, expected_intent):
         """Test classification of price queries."""
-        test_cases = [
-            ("What is the price of wireless headphones?", "price_query"),
-            ("How much does USB cable cost?", "price_query"),
-            ("Show me wholesale prices", "price_query"),
-            ("What are the retail prices?", "price_query"),
-        ]
-        
-        for query, expected_intent in test_cases:
-            result = processor.analyze_intent(query)
-            assert result['type'] == expected_intent, f"Failed for query: {query}"
+        result = processor.analyze_intent(query)
+        assert result['type'] == expected_intent
     
-    def test_general_query_classification(self, processor):
+    @pytest.mark.parametrize("query,expected_intent", [
+        ("Hello", "general"),
+        ("Help me", "general"),
+        ("What can you do?", "general"),
+        ("Random text that doesn't match patterns", "general"),
+    ])
+    def test_general_query_classification(self, processor, query, expected_intent):
         """Test classification of general queries."""
-        test_cases = [
-            ("Hello", "general"),
-            ("Help me", "general"), 
-            ("What can you do?", "general"),
-            ("Random text that doesn't match patterns", "general"),
-        ]
-        
-        for query, expected_intent in test_cases:
-            result = processor.analyze_intent(query)
-            assert result['type'] == expected_intent, f"Failed for query: {query}"
+        result = processor.analyze_intent(query)
+        assert result['type'] == expected_intent
     
-    def test_entity_extraction_product_name(self, processor):
+    @pytest.mark.parametrize("query,expected_product", [
+        ("How much stock of wireless headphones do we have?", "wireless headphones"),
+        ("Find USB cables in inventory", "USB cables"),
+        ("Stock level for \"Bluetooth Speaker\"", "Bluetooth Speaker"),
+        ("Search for 'Gaming Mouse'", "Gaming Mouse"),
+    ])
+    def test_entity_extraction_product_name(self, processor, query, expected_product):
         """Test extraction of product names."""
-        test_cases = [
-            ("How much stock of wireless headphones do we have?", "wireless headphones"),
-            ("Find USB cables in inventory", "USB cables"),
-            ("Stock level for \"Bluetooth Speaker\"", "Bluetooth Speaker"),
-            ("Search for 'Gaming Mouse'", "Gaming Mouse"),
-        ]
+        result = processor.analyze_intent(query)
+        entities = result.get('entities', {})
         
-        for query, expected_product in test_cases:
-            result = processor.analyze_intent(query)
-            entities = result.get('entities', {})
-            
-            # Check if product name or search term was extracted
-            extracted = entities.get('product_name') or entities.get('search_term')
-            assert extracted is not None, f"No product extracted from: {query}"
-            assert expected_product.lower() in extracted.lower(), f"Expected '{expected_product}' in '{extracted}'"
+        # Check if product name or search term was extracted
+        extracted = entities.get('product_name') or entities.get('search_term')
+        assert extracted is not None
+        assert expected_product.lower() in extracted.lower(), f"Expected '{expected_product}' in '{extracted}'"
     
-    def test_entity_extraction_sku(self, processor):
+    @pytest.mark.parametrize("query,expected_sku", [
+        ("Stock for ELE-1234-001", "ELE-1234-001"),
+        ("Find product with sku: TEC-5678-999", "TEC-5678-999"),
+        ("Show me part ABC-1111-222", "ABC-1111-222"),
+    ])
+    def test_entity_extraction_sku(self, processor, query, expected_sku):
         """Test extraction of SKU codes."""
-        test_cases = [
-            ("Stock for ELE-1234-001", "ELE-1234-001"),
-            ("Find product with sku: TEC-5678-999", "TEC-5678-999"),
-            ("Show me part ABC-1111-222", "ABC-1111-222"),
-        ]
+        result = processor.analyze_intent(query)
+        entities = result.get('entities', {})
         
-        for query, expected_sku in test_cases:
-            result = processor.analyze_intent(query)
-            entities = result.get('entities', {})
-            
-            assert 'sku' in entities, f"No SKU extracted from: {query}"
-            assert entities['sku'] == expected_sku
+        assert 'sku' in entities
+        assert entities['sku'] == expected_sku
     
-    def test_entity_extraction_category(self, processor):
+    @pytest.mark.parametrize("query,expected_category", [
+        ("Products in Electronics category", "Electronics"),
+        ("Show me items from Home & Garden category", "Home & Garden"),
+        ("Category: Clothing products", "Clothing"),
+    ])
+    def test_entity_extraction_category(self, processor, query, expected_category):
         """Test extraction of categories."""
-        test_cases = [
-            ("Products in Electronics category", "Electronics"),
-            ("Show me items from Home & Garden category", "Home & Garden"),
-            ("Category: Clothing products", "Clothing"),
-        ]
+        result = processor.analyze_intent(query)
+        entities = result.get('entities', {})
         
-        for query, expected_category in test_cases:
-            result = processor.analyze_intent(query)
-            entities = result.get('entities', {})
-            
-            assert 'category' in entities, f"No category extracted from: {query}"
-            assert expected_category.lower() in entities['category'].lower()
+        assert 'category' in entities
+        assert expected_category.lower() in entities['category'].lower()
     
-    def test_entity_extraction_supplier(self, processor):
+    @pytest.mark.parametrize("query,expected_supplier", [
+        ("Products from TechCorp supplier", "TechCorp"),
+        ("Items supplied by Global Supply Company", "Global Supply Company"),
+        ("Show me supplier: Fashion Plus items", "Fashion Plus"),
+    ])
+    def test_entity_extraction_supplier(self, processor, query, expected_supplier):
         """Test extraction of suppliers."""
-        test_cases = [
-            ("Products from TechCorp supplier", "TechCorp"),
-            ("Items supplied by Global Supply Company", "Global Supply Company"),
-            ("Show me supplier: Fashion Plus items", "Fashion Plus"),
-        ]
+        result = processor.analyze_intent(query)
+        entities = result.get('entities', {})
         
-        for query, expected_supplier in test_cases:
-            result = processor.analyze_intent(query)
-            entities = result.get('entities', {})
-            
-            assert 'supplier' in entities, f"No supplier extracted from: {query}"
-            assert expected_supplier.lower() in entities['supplier'].lower()
+        assert 'supplier' in entities
+        assert expected_supplier.lower() in entities['supplier'].lower()
+    
+    def test_analyze_intent_cached(self, processor):
+        """Test that repeated queries reuse the cached analysis."""
+        query = "Find wireless headphones"
+        first = processor.analyze_intent(query)
+        first['entities']['product_name'] = "changed"
+        first['keywords'].append("changed")
+        
+        with patch.object(processor, '_classify_intent') as mock_classify:
+            second = processor.analyze_intent(query)
+        
+        mock_classify.assert_not_called()
+        assert second['entities'].get('product_name') != "changed"
+        assert "changed" not in second['keywords']
+        
+        processor.clear_cache()
+        assert processor.analyze_intent(query) == second
     
     def test_keyword_extraction(self, processor):
         """Test extraction of relevant keywords."""
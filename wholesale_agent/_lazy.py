@@ -0,0 +1,25 @@
+"""
+Lazy attribute loading for package __init__ modules (PEP 562).
+"""
+import importlib
+import sys
+from typing import Any, Callable, Dict
+
+
+def make_lazy_getattr(package: str, mapping: Dict[str, str]) -> Callable[[str], Any]:
+    """Build a module __getattr__ that imports names from submodules on first access.
+    
+    Args:
+        package: Name of the package the __getattr__ belongs to (its __name__)
+        mapping: Attribute name -> relative submodule name, e.g. {'Config': '.config'}
+    
+    The resolved value is stored on the package, so later lookups skip __getattr__.
+    """
+    def __getattr__(name: str) -> Any:
+        if name not in mapping:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(mapping[name], package), name)
+        setattr(sys.modules[package], name, value)
+        return value
+    
+    return __getattr__
@@ -1,7 +1,15 @@
 """
 Command-line interface for wholesale agent.
 """
-from .chat import ChatInterface
+from .._lazy import make_lazy_getattr
 from .main import main
 
-__all__ = ['ChatInterface', 'main']
\ No newline at end of file
+# The chat interface pulls in the whole agent stack, so it is only
+# imported when first accessed rather than on every CLI start
+_LAZY = {
+    'ChatInterface': '.chat',
+}
+
+__all__ = ['ChatInterface', 'main']
+
+__getattr__ = make_lazy_getattr(__name__, _LAZY)
@@ -5,26 +5,100 @@ import os
 import sys
 import readline
 import atexit
-from typing import Optional, List
+import heapq
+import time
+from collections import deque
+from itertools import islice
+from textwrap import shorten
+from typing import Optional, List, NamedTuple, Union
 from datetime import datetime
-import json
+
+from sqlalchemy import text
 
 from ..core import WholesaleAgent
+from ..utils import serialization
 from ..utils.config import Config
 from ..utils.logger import setup_logger
 
 
+class HistoryEntry(NamedTuple):
+    """One user query or agent response in the chat history."""
+    timestamp: Union[float, str]  # Epoch seconds; ISO string in older saved sessions
+    type: str  # 'user' or 'agent'
+    content: str
+
+
+class _PrefixTrie:
+    """Prefix tree of completion candidates, matched case-insensitively."""
+    
+    def __init__(self, words=()):
+        self._root = {}
+        self._size = 0
+        for word in words:
+            self.add(word)
+    
+    def add(self, word: str):
+        """Add a candidate; matches are returned in the order they were added."""
+        node = self._root
+        for char in word.lower():
+            node = node.setdefault(char, {})
+        node.setdefault(None, []).append((self._size, word))
+        self._size += 1
+    
+    def starting_with(self, prefix: str) -> List[str]:
+        """Return all candidates that start with prefix."""
+        node = self._root
+        for char in prefix.lower():
+            node = node.get(char)
+            if node is None:
+                return []
+        
+        matches = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            for key, child in node.items():
+                if key is None:
+                    matches.extend(child)
+                else:
+                    stack.append(child)
+        return [word for _, word in sorted(matches)]
+
+
 class ChatInterface:
     """Interactive command-line chat interface."""
     
-    def __init__(self, config: Optional[Config] = None, enable_rag: bool = False):
+    # Common wholesale queries offered by tab completion
+    COMMON_QUERIES = (
+        "How much stock do we have?",
+        "Show me low stock products",
+        "Find products in Electronics category",
+        "What is our total inventory value?",
+        "Show me recent inventory movements",
+        "List all suppliers",
+        "Show out of stock products",
+        "What are our top selling categories?",
+        "Find products from specific supplier",
+        "Show pricing for product"
+    )
+    
+    HISTORY_LIMIT = 10000  # Entries kept in memory and written by /save
+    STATUS_TTL = 5.0  # Seconds to reuse the database/LLM checks shown by /status
+    
+    def __init__(self, config: Optional[Config] = None, enable_rag: bool = False,
+                 persist_context: bool = False, enable_cache: bool = False):
         self.config = config or Config()
         self.logger = setup_logger('chat', self.config.log_level)
-        self.agent = WholesaleAgent(enable_rag=enable_rag)
+        # The agent (LLM client, RAG index, stored context) is built on first use
+        self._agent: Optional[WholesaleAgent] = None
+        self._agent_kwargs = {'enable_rag': enable_rag, 'persist_context': persist_context,
+                              'enable_cache': enable_cache}
         
         # Chat history
-        self.history = []
+        self.history: "deque[HistoryEntry]" = deque(maxlen=self.HISTORY_LIMIT)
         self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._sessions_cache = None  # (sessions dir mtime, saved session file names)
+        self._status_cache = (None, 0.0)  # ((db status, llm status), monotonic time checked)
         
         # Setup readline for better CLI experience
         self._setup_readline()
@@ -40,6 +114,12 @@ class ChatInterface:
             'dim': '\033[2m'        # Dim
         }
         
+        # Line templates used by _format_line, built once per interface
+        self._bullet_tpl = f"  {self.colors['dim']}%s{self.colors['reset']}"
+        self._warning_tpl = f"{self.colors['system']}%s{self.colors['reset']}"
+        self._heading_tpl = f"{self.colors['bold']}%s{self.colors['reset']}"
+        self._help_text = self._build_help_text()
+        
         # Command handlers
         self.commands = {
             '/help': self._show_help,
@@ -52,6 +132,18 @@ class ChatInterface:
             '/exit': self._exit,
             '/quit': self._exit
         }
+        
+        # Tab completion candidates; commands start with '/', queries never do
+        self._completion_trie = _PrefixTrie(list(self.commands) + list(self.COMMON_QUERIES))
+        self._completion_text: Optional[str] = None
+        self._completions: List[str] = []
+    
+    @property
+    def agent(self) -> WholesaleAgent:
+        """The wholesale agent, created the first time it is needed."""
+        if self._agent is None:
+            self._agent = WholesaleAgent(**self._agent_kwargs)
+        return self._agent
     
     def _setup_readline(self):
         """Setup readline for command history and completion."""
@@ -64,8 +156,11 @@ class ChatInterface:
         except FileNotFoundError:
             pass
         
-        # Save history on exit
-        atexit.register(readline.write_history_file, history_file)
+        # Save history on exit, appending only this session's lines when supported
+        if hasattr(readline, 'append_history_file'):
+            atexit.register(self._append_history, readline.get_current_history_length(), history_file)
+        else:
+            atexit.register(readline.write_history_file, history_file)
         
         # Set up tab completion
         readline.set_completer(self._completer)
@@ -74,31 +169,28 @@ class ChatInterface:
         # Set history length
         readline.set_history_length(1000)
     
+    @staticmethod
+    def _append_history(prev_length: int, history_file: str):
+        """Append the lines entered since startup to the history file.
+        
+        The file is trimmed to the readline history length afterwards.
+        """
+        new_lines = readline.get_current_history_length() - prev_length
+        if new_lines <= 0:
+            return
+        if not os.path.exists(history_file):
+            open(history_file, 'a').close()
+        readline.append_history_file(new_lines, history_file)
+    
     def _completer(self, text: str, state: int) -> Optional[str]:
         """Tab completion for commands and common queries."""
-        options = []
+        # readline calls this with state 0, 1, 2... for one completion request
+        if state == 0 or text != self._completion_text:
+            self._completion_text = text
+            self._completions = self._completion_trie.starting_with(text)
         
-        # Command completion
-        if text.startswith('/'):
-            options = [cmd for cmd in self.commands.keys() if cmd.startswith(text)]
-        else:
-            # Query completion - common wholesale queries
-            common_queries = [
-                "How much stock do we have?",
-                "Show me low stock products",
-                "Find products in Electronics category",
-                "What is our total inventory value?",
-                "Show me recent inventory movements",
-                "List all suppliers",
-                "Show out of stock products",
-                "What are our top selling categories?",
-                "Find products from specific supplier",
-                "Show pricing for product"
-            ]
-            options = [query for query in common_queries if query.lower().startswith(text.lower())]
-        
-        if state < len(options):
-            return options[state]
+        if state < len(self._completions):
+            return self._completions[state]
         return None
     
     def start(self):
@@ -161,68 +253,68 @@ class ChatInterface:
     def _handle_query(self, query: str):
         """Handle user query."""
         # Add to history
-        self.history.append({
-            'timestamp': datetime.now().isoformat(),
-            'type': 'user',
-            'content': query
-        })
+        self.history.append(HistoryEntry(time.time(), 'user', query))
         
         # Show thinking indicator
         print(f"{self.colors['dim']}🤔 Processing...{self.colors['reset']}", end='', flush=True)
         
         try:
-            # Get response from agent
-            response = self.agent.process_query(query)
-            
-            # Clear thinking indicator
-            print(f"\r{' ' * 20}\r", end='')
-            
-            # Display response
-            self._print_agent_response(response)
+            # Display the response as the agent generates it
+            response = self._print_agent_stream(self.agent.stream_query(query))
             
             # Add response to history
-            self.history.append({
-                'timestamp': datetime.now().isoformat(),
-                'type': 'agent',
-                'content': response
-            })
+            self.history.append(HistoryEntry(time.time(), 'agent', response))
             
         except Exception as e:
             print(f"\r{' ' * 20}\r", end='')
             self._print_error(f"Error processing query: {str(e)}")
             self.logger.error(f"Query processing error: {str(e)}", exc_info=True)
     
-    def _print_agent_response(self, response: str):
-        """Print agent response with formatting."""
-        print(f"{self.colors['agent']}🤖 Agent:{self.colors['reset']}")
-        print(f"{self._format_response(response)}")
+    def _print_agent_stream(self, chunks) -> str:
+        """Print agent response chunks as they arrive and return the full response.
+        
+        Output is formatted a complete line at a time, so bullets, warnings
+        and headings are highlighted the same as in a buffered response.
+        """
+        received = []
+        pending = ''
+        
+        for chunk in chunks:
+            if not received:
+                # Clear thinking indicator once the first chunk arrives
+                print(f"\r{' ' * 20}\r", end='')
+                print(f"{self.colors['agent']}🤖 Agent:{self.colors['reset']}")
+            received.append(chunk)
+            
+            *lines, pending = (pending + chunk).split('\n')
+            for line in lines:
+                sys.stdout.write(self._format_line(line) + '\n')
+            sys.stdout.flush()
+        
+        if not received:
+            print(f"\r{' ' * 20}\r", end='')
+            print(f"{self.colors['agent']}🤖 Agent:{self.colors['reset']}")
+        if pending:
+            sys.stdout.write(self._format_line(pending) + '\n')
         print()
-    
-    def _format_response(self, response: str) -> str:
-        """Format agent response for better readability."""
-        # Add some basic formatting
-        lines = response.split('\n')
-        formatted_lines = []
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                formatted_lines.append('')
-                continue
-                
-            # Highlight bullet points
-            if line.startswith('•'):
-                formatted_lines.append(f"  {self.colors['dim']}{line}{self.colors['reset']}")
-            # Highlight warnings
-            elif '⚠️' in line or 'warning' in line.lower():
-                formatted_lines.append(f"{self.colors['system']}{line}{self.colors['reset']}")
-            # Highlight headings (lines ending with :)
-            elif line.endswith(':'):
-                formatted_lines.append(f"{self.colors['bold']}{line}{self.colors['reset']}")
-            else:
-                formatted_lines.append(line)
         
-        return '\n'.join(formatted_lines)
+        return ''.join(received)
+    
+    def _format_line(self, line: str) -> str:
+        """Format one line of an agent response."""
+        line = line.strip()
+        if not line:
+            return ''
+        # Highlight bullet points
+        if line.startswith('•'):
+            return self._bullet_tpl % line
+        # Highlight warnings
+        if '⚠️' in line or 'warning' in line.lower():
+            return self._warning_tpl % line
+        # Highlight headings (lines ending with :)
+        if line.endswith(':'):
+            return self._heading_tpl % line
+        return line
     
     def _print_info(self, message: str):
         """Print info message."""
@@ -234,8 +326,10 @@ class ChatInterface:
     
     def _show_help(self):
         """Show help information."""
-        print(f"{self.colors['bold']}📋 AVAILABLE COMMANDS:{self.colors['reset']}")
-        print()
+        sys.stdout.write(self._help_text)
+    
+    def _build_help_text(self) -> str:
+        """Render the static /help output once."""
         help_text = [
             ("/help", "Show this help message"),
             ("/clear", "Clear the screen"),
@@ -246,12 +340,6 @@ class ChatInterface:
             ("/config", "Show configuration"),
             ("/exit, /quit", "Exit the chat")
         ]
-        
-        for cmd, desc in help_text:
-            print(f"  {self.colors['user']}{cmd:<12}{self.colors['reset']} - {desc}")
-        
-        print()
-        print(f"{self.colors['bold']}💡 EXAMPLE QUERIES:{self.colors['reset']}")
         examples = [
             "How much stock of wireless headphones do we have?",
             "Show me products running low on stock",
@@ -262,13 +350,25 @@ class ChatInterface:
             "List all active suppliers"
         ]
         
-        for example in examples:
-            print(f"  {self.colors['dim']}• {example}{self.colors['reset']}")
-        print()
+        lines = [f"{self.colors['bold']}📋 AVAILABLE COMMANDS:{self.colors['reset']}", ""]
+        lines.extend(
+            f"  {self.colors['user']}{cmd:<12}{self.colors['reset']} - {desc}"
+            for cmd, desc in help_text
+        )
+        lines.extend(["", f"{self.colors['bold']}💡 EXAMPLE QUERIES:{self.colors['reset']}"])
+        lines.extend(f"  {self.colors['dim']}• {example}{self.colors['reset']}" for example in examples)
+        lines.append("")
+        
+        return "\n".join(lines) + "\n"
     
     def _clear_screen(self):
         """Clear the screen."""
-        os.system('clear' if os.name == 'posix' else 'cls')
+        if os.name == 'nt' and not os.environ.get('WT_SESSION'):
+            os.system('cls')  # Legacy console without ANSI support
+        else:
+            # Clear the screen and move the cursor home without spawning a shell
+            sys.stdout.write('\x1b[2J\x1b[H')
+            sys.stdout.flush()
         self._print_welcome()
     
     def _show_history(self):
@@ -280,16 +380,24 @@ class ChatInterface:
         print(f"{self.colors['bold']}📝 CONVERSATION HISTORY:{self.colors['reset']}")
         print()
         
-        for i, entry in enumerate(self.history[-10:], 1):  # Show last 10 entries
-            timestamp = entry['timestamp'][:19].replace('T', ' ')
-            content = entry['content'][:100] + "..." if len(entry['content']) > 100 else entry['content']
+        recent = reversed(list(islice(reversed(self.history), 10)))  # Show last 10 entries
+        for i, entry in enumerate(recent, 1):
+            timestamp = self._format_timestamp(entry.timestamp)
+            content = shorten(entry.content, width=100, placeholder="...")
             
-            if entry['type'] == 'user':
+            if entry.type == 'user':
                 print(f"{i:2}. [{timestamp}] {self.colors['user']}You:{self.colors['reset']} {content}")
             else:
                 print(f"    [{timestamp}] {self.colors['agent']}Agent:{self.colors['reset']} {content}")
         print()
     
+    @staticmethod
+    def _format_timestamp(timestamp: Union[float, str]) -> str:
+        """Format a history timestamp (epoch seconds, or ISO string from older sessions)."""
+        if isinstance(timestamp, str):
+            return timestamp[:19].replace('T', ' ')
+        return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+    
     def _save_session(self):
         """Save current session to file."""
         if not self.history:
@@ -304,11 +412,11 @@ class ChatInterface:
         
         try:
             with open(filepath, 'w') as f:
-                json.dump({
+                f.write(serialization.dumps({
                     'session_id': self.session_id,
                     'created_at': datetime.now().isoformat(),
-                    'history': self.history
-                }, f, indent=2)
+                    'history': [entry._asdict() for entry in self.history]
+                }))
             
             self._print_info(f"Session saved to {filepath}")
         except Exception as e:
@@ -323,14 +431,16 @@ class ChatInterface:
             return
         
         # List available sessions
-        sessions = [f for f in os.listdir(sessions_dir) if f.endswith('.json')]
+        sessions = self._list_sessions(sessions_dir)
         
         if not sessions:
             self._print_info("No saved sessions found")
             return
         
+        # Show the 5 most recent sessions; names embed their timestamp
+        sessions = sorted(heapq.nlargest(5, sessions))
         print("Available sessions:")
-        for i, session in enumerate(sessions[-5:], 1):  # Show last 5 sessions
+        for i, session in enumerate(sessions, 1):
             print(f"  {i}. {session}")
         
         try:
@@ -342,24 +452,57 @@ class ChatInterface:
             filepath = os.path.join(sessions_dir, session_file)
             
             with open(filepath, 'r') as f:
-                session_data = json.load(f)
+                session_data = serialization.loads(f.read())
             
-            self.history = session_data.get('history', [])
+            self.history = deque(
+                (HistoryEntry(entry['timestamp'], entry['type'], entry['content'])
+                 for entry in session_data.get('history', [])),
+                maxlen=self.HISTORY_LIMIT
+            )
             self._print_info(f"Loaded session: {session_data.get('session_id', 'Unknown')}")
             
-        except (ValueError, IndexError, FileNotFoundError) as e:
+        except (ValueError, IndexError, KeyError, FileNotFoundError) as e:
             self._print_error(f"Failed to load session: {str(e)}")
     
+    def _list_sessions(self, sessions_dir: str) -> List[str]:
+        """List saved session files, rescanning only when the directory changes."""
+        mtime = os.stat(sessions_dir).st_mtime
+        if self._sessions_cache is None or self._sessions_cache[0] != mtime:
+            with os.scandir(sessions_dir) as entries:
+                names = [entry.name for entry in entries if entry.name.endswith('.json') and entry.is_file()]
+            self._sessions_cache = (mtime, names)
+        return self._sessions_cache[1]
+    
     def _show_status(self):
         """Show system status."""
         print(f"{self.colors['bold']}📊 SYSTEM STATUS:{self.colors['reset']}")
         print()
         
+        db_status, llm_status = self._service_status()
+        
+        status_items = [
+            ("Database", db_status),
+            ("AI Model", llm_status),
+            ("Session ID", self.session_id),
+            ("History Entries", str(len(self.history))),
+            ("Log Level", self.config.log_level)
+        ]
+        
+        for label, value in status_items:
+            print(f"  {label:<15}: {value}")
+        print()
+    
+    def _service_status(self):
+        """Check database and LLM availability, reusing results for STATUS_TTL seconds."""
+        statuses, checked_at = self._status_cache
+        if statuses is not None and time.monotonic() - checked_at < self.STATUS_TTL:
+            return statuses
+        
         # Database connectivity
         try:
             from ..models import db_manager
-            with db_manager.get_session() as session:
-                session.execute("SELECT 1")
+            with db_manager.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
             db_status = "🟢 Connected"
         except Exception as e:
             db_status = f"🔴 Error: {str(e)}"
@@ -371,17 +514,9 @@ class ChatInterface:
         except Exception:
             llm_status = "🔴 Unavailable"
         
-        status_items = [
-            ("Database", db_status),
-            ("AI Model", llm_status),
-            ("Session ID", self.session_id),
-            ("History Entries", str(len(self.history))),
-            ("Log Level", self.config.log_level)
-        ]
-        
-        for label, value in status_items:
-            print(f"  {label:<15}: {value}")
-        print()
+        statuses = (db_status, llm_status)
+        self._status_cache = (statuses, time.monotonic())
+        return statuses
     
     def _show_config(self):
         """Show current configuration."""
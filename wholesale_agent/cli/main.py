@@ -4,16 +4,14 @@ Main CLI entry point for wholesale agent.
 """
 import sys
 import argparse
+import functools
 import os
-from typing import Optional
+from typing import List, Optional
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from wholesale_agent.cli.chat import ChatInterface
 from wholesale_agent.utils.config import Config
-from wholesale_agent.utils.migrations import migration_manager
-from wholesale_agent.utils.mock_data import MockDataGenerator
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -28,6 +26,7 @@ Examples:
   %(prog)s --migrate          # Run database migrations
   %(prog)s --query "stock"    # Run single query and exit
   %(prog)s --config-check     # Check configuration
+  %(prog)s --enable-cache     # Reuse answers to repeated questions
         """
     )
     
@@ -79,6 +78,18 @@ Examples:
         help='Enable RAG (Retrieval-Augmented Generation) pipeline'
     )
     
+    parser.add_argument(
+        '--persist-context',
+        action='store_true',
+        help='Restore and save conversation context across sessions'
+    )
+    
+    parser.add_argument(
+        '--enable-cache',
+        action='store_true',
+        help='Serve repeated questions from the semantic response cache'
+    )
+    
     parser.add_argument(
         '--setup-rag',
         action='store_true',
@@ -90,6 +101,8 @@ Examples:
 
 def setup_database():
     """Initialize database with schema and mock data."""
+    from wholesale_agent.utils.migrations import migration_manager
+    
     print("🔧 Setting up database...")
     
     # Initialize database
@@ -104,6 +117,8 @@ def setup_database():
         return False
     
     # Generate mock data
+    from wholesale_agent.utils.mock_data import MockDataGenerator
+    
     print("🎲 Generating mock data...")
     generator = MockDataGenerator()
     generator.generate_all_data()
@@ -114,6 +129,8 @@ def setup_database():
 
 def run_migrations():
     """Run database migrations."""
+    from wholesale_agent.utils.migrations import migration_manager
+    
     print("📦 Running database migrations...")
     success = migration_manager.run_migrations()
     
@@ -128,6 +145,8 @@ def run_migrations():
 
 def generate_mock_data():
     """Generate mock data."""
+    from wholesale_agent.utils.mock_data import MockDataGenerator
+    
     print("🎲 Generating mock data...")
     
     try:
@@ -140,15 +159,29 @@ def generate_mock_data():
         return False
 
 
-def run_single_query(query: str, config: Config):
-    """Run a single query and exit."""
+@functools.lru_cache(maxsize=1)
+def _get_llm_client():
+    """Create the LLM client once per process and share it between commands."""
+    from wholesale_agent.core import LLMClient
+    return LLMClient()
+
+
+@functools.lru_cache(maxsize=4)
+def _get_agent(persist_context: bool = False, enable_cache: bool = False):
+    """Create the agent once per process for each persist_context/enable_cache setting."""
     from wholesale_agent.core import WholesaleAgent
-    
+    return WholesaleAgent(llm_client=_get_llm_client(), persist_context=persist_context,
+                          enable_cache=enable_cache)
+
+
+def run_single_query(query: str, config: Config, persist_context: bool = False,
+                     enable_cache: bool = False):
+    """Run a single query and exit."""
     print(f"🔍 Processing query: {query}")
     print("─" * 50)
     
     try:
-        agent = WholesaleAgent()
+        agent = _get_agent(persist_context, enable_cache)
         response = agent.process_query(query)
         print(response)
         return True
@@ -165,9 +198,11 @@ def check_configuration(config: Config):
     # Database connectivity
     print("🗄️  Database:")
     try:
+        from sqlalchemy import text
         from wholesale_agent.models import db_manager
-        with db_manager.get_session() as session:
-            session.execute("SELECT 1")
+        db_manager.warmup()
+        with db_manager.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
         print("  ✅ Database connection: OK")
     except Exception as e:
         print(f"  ❌ Database connection: FAILED ({str(e)})")
@@ -175,8 +210,7 @@ def check_configuration(config: Config):
     # LLM configuration
     print("\\n🤖 AI Model:")
     try:
-        from wholesale_agent.core import LLMClient
-        llm_client = LLMClient()
+        llm_client = _get_llm_client()
         model_info = llm_client.get_model_info()
         print(f"  Provider: {model_info.get('provider', 'Unknown')}")
         print(f"  Model: {model_info.get('model', 'Unknown')}")
@@ -206,8 +240,7 @@ def check_configuration(config: Config):
     
     print("\\n🔍 Quick Test:")
     try:
-        from wholesale_agent.core import WholesaleAgent
-        agent = WholesaleAgent()
+        agent = _get_agent(False, False)
         response = agent.process_query("system status")
         print("  ✅ Agent query test: PASSED")
     except Exception as e:
@@ -241,53 +274,67 @@ def setup_rag():
         return False
 
 
-def main():
-    """Main CLI entry point."""
-    parser = create_parser()
-    args = parser.parse_args()
-    
-    # Load configuration
-    config = Config(
+def _load_config(args: argparse.Namespace) -> Config:
+    """Load configuration from the --config and --debug arguments."""
+    return Config(
         config_file=args.config,
         debug=args.debug
     )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Main CLI entry point.
     
-    # Handle specific commands
+    Parses ``argv`` (defaults to ``sys.argv[1:]``) and returns the process
+    exit code instead of exiting, so it can be called directly.
+    """
+    parser = create_parser()
+    args = parser.parse_args(argv)
+    
+    # Handle specific commands. Configuration is only loaded by the commands
+    # that read it, so setup and maintenance commands skip the file lookup.
     if args.setup:
         success = setup_database()
-        sys.exit(0 if success else 1)
+        return 0 if success else 1
     
     elif args.migrate:
         success = run_migrations()
-        sys.exit(0 if success else 1)
+        return 0 if success else 1
     
     elif args.generate_data:
         success = generate_mock_data()
-        sys.exit(0 if success else 1)
+        return 0 if success else 1
     
     elif args.config_check:
-        check_configuration(config)
-        sys.exit(0)
+        check_configuration(_load_config(args))
+        return 0
     
     elif args.setup_rag:
         success = setup_rag()
-        sys.exit(0 if success else 1)
+        return 0 if success else 1
     
     elif args.query:
-        success = run_single_query(args.query, config)
-        sys.exit(0 if success else 1)
+        success = run_single_query(args.query, _load_config(args),
+                                   persist_context=args.persist_context,
+                                   enable_cache=args.enable_cache)
+        return 0 if success else 1
     
     else:
         # Start interactive chat
+        from wholesale_agent.cli.chat import ChatInterface
+        
         try:
-            chat = ChatInterface(config, enable_rag=args.enable_rag)
+            chat = ChatInterface(_load_config(args), enable_rag=args.enable_rag,
+                                 persist_context=args.persist_context,
+                                 enable_cache=args.enable_cache)
             chat.start()
         except KeyboardInterrupt:
             print("\\n👋 Goodbye!")
         except Exception as e:
             print(f"❌ Fatal error: {str(e)}")
-            sys.exit(1)
+            return 1
+        return 0
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
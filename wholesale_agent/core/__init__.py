@@ -2,15 +2,26 @@
 Core functionality for wholesale AI agent.
 New architecture: LLM for intent → App executes action → LLM formats response
 """
-from .agent import WholesaleAgent
-from .llm_client import LLMClient, LLMConfig
-from .intent_analyzer import IntentAnalyzer, IntentResult
-from .action_executor import ActionExecutor, ActionResult
-from .response_formatter import ResponseFormatter
-from .conversation_context import ConversationContext, ConversationTurn
+from .._lazy import make_lazy_getattr
 
-# Keep legacy imports for backward compatibility
-from .query_processor import QueryProcessor, QueryIntent
+# Each public name maps to the submodule defining it. Submodules are only
+# imported when one of their names is first accessed, so importing a single
+# class does not load the whole agent stack.
+_LAZY = {
+    'WholesaleAgent': '.agent',
+    'LLMClient': '.llm_client',
+    'LLMConfig': '.llm_client',
+    'IntentAnalyzer': '.intent_analyzer',
+    'IntentResult': '.intent_analyzer',
+    'ActionExecutor': '.action_executor',
+    'ActionResult': '.action_executor',
+    'ResponseFormatter': '.response_formatter',
+    'ConversationContext': '.conversation_context',
+    'ConversationTurn': '.conversation_context',
+    # Keep legacy imports for backward compatibility
+    'QueryProcessor': '.query_processor',
+    'QueryIntent': '.query_processor',
+}
 
 __all__ = [
     'WholesaleAgent',
@@ -26,4 +37,10 @@ __all__ = [
     # Legacy exports
     'QueryProcessor',
     'QueryIntent'
-]
\ No newline at end of file
+]
+
+__getattr__ = make_lazy_getattr(__name__, _LAZY)
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
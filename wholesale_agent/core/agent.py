@@ -2,22 +2,26 @@
 AI Agent core functionality for wholesale business operations.
 New architecture: LLM for intent → App executes action → LLM formats response
 """
+import os
+import asyncio
 import logging
-from typing import Optional, Dict, Any
+from dataclasses import asdict
+from typing import Optional, Dict, Any, Iterator
 
 from .llm_client import LLMClient
-from .intent_analyzer import IntentAnalyzer
+from .intent_analyzer import IntentAnalyzer, IntentResult
 from .action_executor import ActionExecutor, ActionResult
 from .response_formatter import ResponseFormatter
 from .conversation_context import ConversationContext
 
 try:
-    from .rag_pipeline import RAGPipeline
-    RAG_AVAILABLE = True
+    from .rag_pipeline import RAGPipeline, EMBEDDINGS_AVAILABLE as RAG_AVAILABLE
 except ImportError:
     RAG_AVAILABLE = False
     RAGPipeline = None
 
+from .semantic_cache import SemanticCache, CACHE_AVAILABLE
+
 
 class WholesaleAgent:
     """AI Agent for wholesale business operations.
@@ -29,14 +33,27 @@ class WholesaleAgent:
     4. If intent is unclear, LLM asks follow-up questions
     """
     
-    def __init__(self, llm_client: Optional[LLMClient] = None, enable_rag: bool = False):
+    def __init__(self, llm_client: Optional[LLMClient] = None, enable_rag: bool = False,
+                 enable_cache: bool = False, persist_context: bool = False,
+                 user_id: Optional[str] = None):
         self.llm_client = llm_client or LLMClient()
         self.intent_analyzer = IntentAnalyzer(self.llm_client)
         self.action_executor = ActionExecutor()
         self.response_formatter = ResponseFormatter(self.llm_client)
-        self.conversation_context = ConversationContext()
         self.logger = logging.getLogger(__name__)
         
+        # Restore the previous conversation from disk if requested
+        self.persist_context = False
+        self.conversation_context = ConversationContext()
+        if persist_context:
+            try:
+                self.conversation_context = ConversationContext.load(
+                    user_id=user_id or os.getenv('USER', 'default')
+                )
+                self.persist_context = True
+            except Exception as e:
+                self.logger.warning(f"Conversation context restore failed: {e}")
+        
         # Initialize RAG pipeline if requested and available
         self.rag_pipeline = None
         if enable_rag and RAG_AVAILABLE:
@@ -48,42 +65,40 @@ class WholesaleAgent:
                 self.logger.warning(f"RAG pipeline initialization failed: {e}")
         elif enable_rag and not RAG_AVAILABLE:
             self.logger.warning("RAG requested but dependencies not installed. Install with: pip install sentence-transformers faiss-cpu")
+        
+        # Initialize semantic response cache if requested and available
+        self.response_cache = None
+        if enable_cache and CACHE_AVAILABLE:
+            try:
+                self.response_cache = SemanticCache()
+                self.logger.info("Semantic response cache initialized successfully")
+            except Exception as e:
+                self.logger.warning(f"Semantic cache initialization failed: {e}")
+        elif enable_cache and not CACHE_AVAILABLE:
+            self.logger.warning("Semantic cache requested but dependencies not installed. Install with: pip install sentence-transformers faiss-cpu")
+        
+        # Restored turns carry no embeddings; recompute them so follow-ups can hit the cache
+        if self.response_cache:
+            for turn in self.conversation_context.history:
+                if turn.embedding is None:
+                    turn.embedding = self.response_cache.embed(turn.user_query)
     
     def process_query(self, user_query: str) -> str:
         """Process user query using new architecture with conversation context: LLM Intent → App Action → LLM Response."""
         try:
             self.logger.info(f"Processing query: {user_query}")
             
-            # Step 0: Get conversation context for this query
-            context = self.conversation_context.get_context_for_query(user_query)
-            self.logger.debug(f"Conversation context: {context.get('has_history', False)}, recent_products: {len(context.get('recent_products', []))}")
-            
-            # Step 1: LLM analyzes user intent and extracts entities with context
-            self.logger.debug("Step 1: Analyzing intent with LLM and conversation context")
-            intent_result = self.intent_analyzer.analyze_intent(user_query, context)
-            self.logger.debug(f"Intent analysis result: {intent_result.intent_type}, confidence: {intent_result.confidence}")
-            
-            # Step 2: App executes business action based on intent
-            self.logger.debug("Step 2: Executing business action")
-            action_result = self.action_executor.execute_action(intent_result)
-            
-            # Safety check for action_result
-            if action_result is None:
-                self.logger.error("ActionExecutor returned None - this should not happen")
-                action_result = ActionResult(
-                    success=False,
-                    action_type="error",
-                    error="Internal error: ActionExecutor returned None"
-                )
-            
-            self.logger.debug(f"Action result: {action_result.action_type}, success: {action_result.success}")
+            turn = self._begin_turn(user_query)
+            if 'cached_response' in turn:
+                return turn['cached_response']
             
             # Step 3: LLM formats structured results into beautiful response with context
             self.logger.debug("Step 3: Formatting response with LLM") 
-            formatted_response = self.response_formatter.format_response(user_query, action_result, context)
+            formatted_response = self.response_formatter.format_response(
+                user_query, turn['action_result'], turn['context']
+            )
             
-            # Step 4: Add this turn to conversation context
-            self.conversation_context.add_turn(user_query, intent_result, action_result, formatted_response)
+            self._complete_turn(user_query, turn, formatted_response)
             
             self.logger.info("Query processed successfully with context-aware architecture")
             return formatted_response
@@ -91,6 +106,137 @@ class WholesaleAgent:
         except Exception as e:
             self.logger.error(f"Error processing query: {str(e)}")
             return f"I apologize, but I encountered an error processing your request: {str(e)}"
+        
+        finally:
+            self._save_context()
+    
+    def stream_query(self, user_query: str) -> Iterator[str]:
+        """Process user query like process_query, yielding the response as it is generated.
+        
+        The chunks are buffered and the full response is added to the conversation
+        context once the stream completes.
+        """
+        try:
+            self.logger.info(f"Streaming query: {user_query}")
+            
+            turn = self._begin_turn(user_query)
+            if 'cached_response' in turn:
+                yield turn['cached_response']
+                return
+            
+            # Step 3: Stream the formatted response while buffering it for the context
+            chunks = []
+            for chunk in self.response_formatter.stream_response(
+                user_query, turn['action_result'], turn['context']
+            ):
+                chunks.append(chunk)
+                yield chunk
+            
+            self._complete_turn(user_query, turn, "".join(chunks))
+            
+        except Exception as e:
+            self.logger.error(f"Error streaming query: {str(e)}")
+            yield f"I apologize, but I encountered an error processing your request: {str(e)}"
+        
+        finally:
+            self._save_context()
+    
+    def _begin_turn(self, user_query: str) -> Dict[str, Any]:
+        """Run context lookup, intent analysis and action execution for a query.
+        
+        Returns the intermediate results, or only 'cached_response' on a semantic cache hit.
+        """
+        # Step 0: Get conversation context for this query
+        context = self.conversation_context.get_context_for_query(user_query)
+        self.logger.debug(f"Conversation context: {context.get('has_history', False)}, recent_products: {len(context.get('recent_products', []))}")
+        
+        # Serve from the semantic cache when an equivalent query was answered in a similar context
+        query_embedding = lookup_vector = None
+        if self.response_cache:
+            query_embedding = self.response_cache.embed(user_query)
+            lookup_vector = self.response_cache.lookup_vector(
+                query_embedding, self.conversation_context.get_recent_turn_embeddings()
+            )
+            cached = self.response_cache.get(lookup_vector)
+            if cached is not None:
+                self.conversation_context.add_turn(
+                    user_query,
+                    IntentResult(**cached['intent']),
+                    ActionResult(**cached['action']),
+                    cached['response'],
+                    embedding=query_embedding
+                )
+                self.logger.info("Query served from semantic cache")
+                return {'cached_response': cached['response']}
+        
+        # Step 1: LLM analyzes user intent and extracts entities with context
+        self.logger.debug("Step 1: Analyzing intent with LLM and conversation context")
+        intent_result = self.intent_analyzer.analyze_intent(user_query, context)
+        self.logger.debug(f"Intent analysis result: {intent_result.intent_type}, confidence: {intent_result.confidence}")
+        
+        # Step 2: App executes business action based on intent
+        self.logger.debug("Step 2: Executing business action")
+        action_result = self.action_executor.execute_action(intent_result)
+        
+        # Safety check for action_result
+        if action_result is None:
+            self.logger.error("ActionExecutor returned None - this should not happen")
+            action_result = ActionResult(
+                success=False,
+                action_type="error",
+                error="Internal error: ActionExecutor returned None"
+            )
+        
+        self.logger.debug(f"Action result: {action_result.action_type}, success: {action_result.success}")
+        
+        return {
+            'context': context,
+            'intent_result': intent_result,
+            'action_result': action_result,
+            'query_embedding': query_embedding,
+            'lookup_vector': lookup_vector
+        }
+    
+    def _complete_turn(self, user_query: str, turn: Dict[str, Any], formatted_response: str) -> None:
+        """Record a finished turn in the conversation context and the response cache."""
+        intent_result = turn['intent_result']
+        action_result = turn['action_result']
+        
+        # Step 4: Add this turn to conversation context
+        self.conversation_context.add_turn(
+            user_query, intent_result, action_result, formatted_response,
+            embedding=turn['query_embedding']
+        )
+        
+        if not self.response_cache:
+            return
+        
+        # A successful stock change invalidates every answer cached before it
+        if action_result.action_type == 'inventory_management' and action_result.success:
+            self.response_cache.clear()
+        elif self.response_cache.is_cacheable(action_result.action_type, action_result.success):
+            self.response_cache.put(turn['lookup_vector'], {
+                'response': formatted_response,
+                'intent': asdict(intent_result),
+                'action': asdict(action_result)
+            }, ttl_seconds=self.response_cache.ttl_for(action_result.action_type))
+    
+    def _save_context(self) -> None:
+        """Persist new conversation turns when context persistence is enabled."""
+        if self.persist_context:
+            try:
+                self.conversation_context.save()
+            except Exception as e:
+                self.logger.warning(f"Failed to persist conversation context: {e}")
+    
+    async def aprocess_query(self, user_query: str) -> str:
+        """Async variant of process_query for running several conversations concurrently.
+        
+        The pipeline blocks on LLM HTTP calls and DB queries, so it runs in the default
+        executor. Turns of one agent must still be awaited in order to keep context intact.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.process_query, user_query)
     
     def clear_conversation(self) -> None:
         """Clear conversation context (useful for starting fresh)."""
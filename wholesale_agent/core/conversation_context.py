@@ -2,13 +2,56 @@
 Conversation context management for wholesale agent.
 Maintains conversation history to enable follow-up queries and contextual understanding.
 """
+import os
+import re
+import sqlite3
 import logging
-from typing import List, Dict, Any, Optional
+from collections import deque, defaultdict
+from typing import List, Dict, Any, Optional, Deque
 from dataclasses import dataclass
 from datetime import datetime
 
 from .intent_analyzer import IntentResult
 from .action_executor import ActionResult
+from ..utils import serialization
+
+
+def _phrase_pattern(*phrases: str) -> "re.Pattern":
+    """Compile a case-insensitive whole-word alternation of phrases."""
+    return re.compile(r'\b(?:' + '|'.join(map(re.escape, phrases)) + r')\b', re.IGNORECASE)
+
+
+# Pronouns that point back at the most recently mentioned product
+PRONOUN_PATTERN = _phrase_pattern('it', 'its', 'that', 'this')
+
+# Pronouns and references that indicate context dependency
+CONTEXTUAL_PATTERN = _phrase_pattern(
+    'it', 'that', 'those', 'them', 'this', 'these',
+    'same', 'also', 'too', 'again', 'more',
+    'what about', 'how about', 'and', 'also check',
+    'now', 'then', 'after that', 'afterwards'
+)
+
+FOLLOW_UP_PATTERN = _phrase_pattern(
+    'what about', 'how about', 'and the', 'also',
+    'now show', 'then', 'after', 'next',
+    'what is', 'how much', 'check the'
+)
+
+PRODUCT_REFERENCE_PATTERN = _phrase_pattern('that product', 'this product', 'it', 'that item')
+
+SAME_ACTION_PATTERN = _phrase_pattern('again', 'same', 'also', 'more')
+
+# Entity index key that always holds the most recent mentions
+LAST_MENTION_KEY = '_last'
+
+
+@dataclass
+class ProductRef:
+    """Reference to a product mentioned during the conversation."""
+    name: str
+    sku: Optional[str] = None
+    turn_id: int = 0
 
 
 @dataclass
@@ -20,11 +63,15 @@ class ConversationTurn:
     action_result: ActionResult
     response: str
     turn_id: int
+    embedding: Optional[Any] = None  # Query embedding, set when semantic caching is enabled
 
 
 class ConversationContext:
     """Manages conversation context and history for contextual understanding."""
     
+    DEFAULT_DB_PATH = "~/.wholesale_agent/context.sqlite"
+    PROMPT_RESPONSE_CHARS = 500  # Assistant replies are truncated in prompt history
+    
     def __init__(self, max_turns: int = 10):
         """Initialize conversation context.
         
@@ -37,12 +84,129 @@ class ConversationContext:
         self.logger = logging.getLogger(__name__)
         
         # Context tracking
-        self.last_mentioned_products = []  # Products mentioned in recent turns
+        self.last_mentioned_products: Deque[str] = deque(maxlen=5)  # Products mentioned in recent turns
         self.last_action_type = None       # Last action performed
         self.last_entities = {}            # Last extracted entities
+        
+        # Hash index of mentioned products by normalized name, plus LAST_MENTION_KEY
+        self._entity_index: Dict[str, Deque[ProductRef]] = defaultdict(lambda: deque(maxlen=5))
+        
+        # Running summary of the last few turns, updated incrementally in add_turn
+        self._summary_parts = deque(maxlen=min(3, max_turns))
+        self._summary = "No previous conversation"
+        
+        # Append-only chat messages replayed to the LLM. Entries are never edited,
+        # so consecutive requests share a prefix that providers can cache; when the
+        # window is full it is reset to a summary instead of being trimmed.
+        self._prompt_messages: List[Dict[str, str]] = []
+        self._prompt_turns = 0
+        
+        # Same turns for the intent classifier, with the intent JSON it returned as
+        # the assistant reply, so its history matches the format it must answer in
+        self._intent_messages: List[Dict[str, str]] = []
+        
+        # SQLite store for persisted turns, attached by load()/save()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._user_id: Optional[str] = None
+        self._saved_turn_id = 0
+    
+    @classmethod
+    def load(cls, db_path: str = DEFAULT_DB_PATH, user_id: str = "default",
+             max_turns: int = 10) -> "ConversationContext":
+        """Restore the most recent turns of a user's conversation from SQLite.
+        
+        Args:
+            db_path: Path to the SQLite context store
+            user_id: Conversation owner
+            max_turns: Maximum number of conversation turns to remember
+        """
+        context = cls(max_turns=max_turns)
+        context._attach(db_path, user_id)
+        
+        rows = context._conn.execute(
+            "SELECT turn_id, ts, query, intent_json, action_json, response "
+            "FROM conversation_turns WHERE user_id = ? ORDER BY turn_id DESC LIMIT ?",
+            (user_id, max_turns)
+        ).fetchall()
+        
+        for turn_id, ts, query, intent_json, action_json, response in reversed(rows):
+            try:
+                intent_result = IntentResult(**serialization.loads(intent_json))
+                action_result = ActionResult(**serialization.loads(action_json))
+            except (TypeError, ValueError) as e:
+                context.logger.warning(f"Skipping unreadable stored turn {turn_id}: {e}")
+                continue
+            
+            context.add_turn(query, intent_result, action_result, response)
+            context.history[-1].turn_id = turn_id
+            context.history[-1].timestamp = datetime.fromtimestamp(ts)
+            context.turn_counter = context._saved_turn_id = turn_id
+        
+        context.logger.debug(f"Restored {len(context.history)} conversation turns for {user_id}")
+        return context
+    
+    def save(self, db_path: Optional[str] = None, user_id: Optional[str] = None) -> None:
+        """Append turns not yet persisted to the SQLite store.
+        
+        Args:
+            db_path: Path to the SQLite context store (defaults to the loaded one)
+            user_id: Conversation owner (defaults to the loaded one)
+        """
+        if self._conn is None or db_path is not None or user_id is not None:
+            self._attach(db_path or self.DEFAULT_DB_PATH, user_id or self._user_id or "default")
+        
+        new_turns = [turn for turn in self.history if turn.turn_id > self._saved_turn_id]
+        if not new_turns:
+            return
+        
+        self._conn.executemany(
+            "INSERT INTO conversation_turns "
+            "(user_id, turn_id, ts, query, intent_json, action_json, response) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    self._user_id,
+                    turn.turn_id,
+                    turn.timestamp.timestamp(),
+                    turn.user_query,
+                    serialization.dumps(turn.intent_result),
+                    serialization.dumps(turn.action_result),
+                    turn.response
+                )
+                for turn in new_turns
+            ]
+        )
+        self._conn.commit()
+        self._saved_turn_id = new_turns[-1].turn_id
+    
+    def _attach(self, db_path: str, user_id: str) -> None:
+        """Open (and create if needed) the SQLite context store."""
+        db_path = os.path.expanduser(db_path)
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        
+        if self._conn is not None:
+            self._conn.close()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS conversation_turns (
+                id INTEGER PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                turn_id INTEGER NOT NULL,
+                ts REAL NOT NULL,
+                query TEXT NOT NULL,
+                intent_json TEXT NOT NULL,
+                action_json TEXT NOT NULL,
+                response TEXT NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_conversation_turns_user ON conversation_turns (user_id, turn_id)"
+        )
+        self._conn.commit()
+        self._user_id = user_id
     
     def add_turn(self, user_query: str, intent_result: IntentResult, 
-                 action_result: ActionResult, response: str) -> None:
+                 action_result: ActionResult, response: str, embedding: Optional[Any] = None) -> None:
         """Add a new conversation turn to the history."""
         self.turn_counter += 1
         
@@ -52,7 +216,8 @@ class ConversationContext:
             intent_result=intent_result,
             action_result=action_result,
             response=response,
-            turn_id=self.turn_counter
+            turn_id=self.turn_counter,
+            embedding=embedding
         )
         
         self.history.append(turn)
@@ -64,6 +229,13 @@ class ConversationContext:
         # Update context tracking
         self._update_context_tracking(intent_result, action_result)
         
+        # Prompt history first, so a reset summarizes only the earlier turns
+        self._append_prompt_turn(user_query, response, intent_result)
+        
+        # Fold the new turn into the running summary
+        self._summary_parts.append(self._summarize_turn(intent_result))
+        self._summary = "; ".join(self._summary_parts)
+        
         self.logger.debug(f"Added conversation turn {self.turn_counter}")
     
     def _update_context_tracking(self, intent_result: IntentResult, action_result: ActionResult) -> None:
@@ -71,6 +243,10 @@ class ConversationContext:
         self.last_action_type = action_result.action_type
         self.last_entities = intent_result.entities
         
+        # Extract products from action result data
+        if action_result.data and isinstance(action_result.data, (list, dict)):
+            self._extract_products_from_action_data(action_result.data)
+        
         # Track mentioned products - but ONLY if they were actually found
         # Don't pollute context with non-existent products
         if (action_result.success and 
@@ -78,48 +254,57 @@ class ConversationContext:
             action_result.data):  # Only track if we have actual data
             
             product_name = intent_result.entities['product_name']
-            if product_name and product_name not in self.last_mentioned_products:
-                # Additional check: make sure we actually found products
-                if isinstance(action_result.data, list) and action_result.data:
-                    # We found actual products, so this is a valid product to remember
-                    self.last_mentioned_products.append(product_name)
-                    # Keep only last 5 mentioned products
-                    if len(self.last_mentioned_products) > 5:
-                        self.last_mentioned_products.pop(0)
-        
-        # Extract products from action result data
-        if action_result.data and isinstance(action_result.data, (list, dict)):
-            self._extract_products_from_action_data(action_result.data)
+            # Additional check: make sure we actually found products
+            if product_name and isinstance(action_result.data, list) and action_result.data:
+                # We found actual products, so this is a valid product to remember
+                self._remember_product(ProductRef(name=product_name, turn_id=self.turn_counter))
     
     def _extract_products_from_action_data(self, data: Any) -> None:
         """Extract product names from action result data."""
         try:
             if isinstance(data, list):
-                for item in data[:3]:  # Only check first 3 items
-                    if isinstance(item, dict) and 'name' in item:
-                        product_name = item['name']
-                        if product_name not in self.last_mentioned_products:
-                            self.last_mentioned_products.append(product_name)
+                items = data[:3]  # Only check first 3 items
             elif isinstance(data, dict):
                 # Handle various data structures
                 if 'name' in data:
-                    product_name = data['name']
-                    if product_name not in self.last_mentioned_products:
-                        self.last_mentioned_products.append(product_name)
-                elif 'sample_products' in data:
-                    for item in data['sample_products'][:3]:
-                        if 'name' in item:
-                            product_name = item['name']
-                            if product_name not in self.last_mentioned_products:
-                                self.last_mentioned_products.append(product_name)
+                    items = [data]
+                else:
+                    items = data.get('sample_products', [])[:3]
+            else:
+                items = []
+            
+            for item in items:
+                if isinstance(item, dict) and 'name' in item:
+                    self._remember_product(ProductRef(
+                        name=item['name'],
+                        sku=item.get('sku'),
+                        turn_id=self.turn_counter
+                    ))
         except Exception as e:
             self.logger.debug(f"Error extracting products from action data: {e}")
     
+    def _remember_product(self, ref: ProductRef) -> None:
+        """Record a product mention in the recent list and the entity index."""
+        if ref.name not in self.last_mentioned_products:
+            self.last_mentioned_products.append(ref.name)  # maxlen evicts the oldest
+        
+        self._entity_index[ref.name.lower().strip()].append(ref)
+        self._entity_index[LAST_MENTION_KEY].append(ref)
+    
+    def resolve_reference(self, user_query: str) -> Optional[ProductRef]:
+        """Resolve a pronoun in the query to the most recently mentioned product."""
+        last_mentions = self._entity_index.get(LAST_MENTION_KEY)
+        if last_mentions and PRONOUN_PATTERN.search(user_query):
+            return last_mentions[-1]
+        return None
+    
     def get_context_for_query(self, user_query: str) -> Dict[str, Any]:
         """Get relevant context information for the current query."""
         context = {
+            'messages': self.get_prompt_messages(),
+            'intent_messages': self.get_intent_messages(),
             'has_history': len(self.history) > 0,
-            'recent_products': self.last_mentioned_products.copy(),
+            'recent_products': list(self.last_mentioned_products),
             'last_action_type': self.last_action_type,
             'last_entities': self.last_entities.copy(),
             'conversation_summary': self._get_conversation_summary()
@@ -129,90 +314,55 @@ class ConversationContext:
         contextual_indicators = self._detect_contextual_references(user_query)
         context.update(contextual_indicators)
         
+        # Resolve pronouns ("it", "that") to a concrete product
+        resolved = self.resolve_reference(user_query)
+        if resolved:
+            context['resolved_product'] = resolved.name
+        
         return context
     
     def _detect_contextual_references(self, user_query: str) -> Dict[str, Any]:
         """Detect if the query contains contextual references."""
-        query_lower = user_query.lower().strip()
-        
-        indicators = {
-            'refers_to_previous': False,
-            'refers_to_that_product': False,
-            'refers_to_same_action': False,
-            'is_follow_up': False
+        return {
+            'refers_to_previous': bool(CONTEXTUAL_PATTERN.search(user_query)),
+            'refers_to_that_product': bool(PRODUCT_REFERENCE_PATTERN.search(user_query)),
+            'refers_to_same_action': bool(SAME_ACTION_PATTERN.search(user_query)),
+            'is_follow_up': bool(FOLLOW_UP_PATTERN.search(user_query))
         }
-        
-        # Detect pronouns and references that indicate context dependency
-        contextual_words = [
-            'it', 'that', 'those', 'them', 'this', 'these',
-            'same', 'also', 'too', 'again', 'more',
-            'what about', 'how about', 'and', 'also check',
-            'now', 'then', 'after that', 'afterwards'
-        ]
-        
-        follow_up_patterns = [
-            'what about', 'how about', 'and the', 'also',
-            'now show', 'then', 'after', 'next',
-            'what is', 'how much', 'check the'
-        ]
-        
-        for word in contextual_words:
-            if word in query_lower:
-                indicators['refers_to_previous'] = True
-                break
-        
-        for pattern in follow_up_patterns:
-            if pattern in query_lower:
-                indicators['is_follow_up'] = True
-                break
-        
-        # Check for product references
-        if any(word in query_lower for word in ['that product', 'this product', 'it', 'that item']):
-            indicators['refers_to_that_product'] = True
-        
-        # Check for action references
-        if any(word in query_lower for word in ['again', 'same', 'also', 'more']):
-            indicators['refers_to_same_action'] = True
-        
-        return indicators
     
     def _get_conversation_summary(self) -> str:
-        """Generate a brief summary of recent conversation."""
-        if not self.history:
-            return "No previous conversation"
-        
-        recent_turns = self.history[-3:]  # Last 3 turns
-        summary_parts = []
-        
-        for turn in recent_turns:
-            # Create a brief summary of each turn
-            intent_type = turn.intent_result.intent_type
-            entities = turn.intent_result.entities
-            
-            if intent_type == 'inventory_management':
-                action = entities.get('action', 'action')
-                product = entities.get('product_name', 'product')
-                quantity = entities.get('quantity', 'some')
-                summary_parts.append(f"User performed {action} operation on {product} ({quantity} units)")
-            elif intent_type == 'inventory_query':
-                product = entities.get('product_name', 'products')
-                summary_parts.append(f"User queried inventory for {product}")
-            elif intent_type == 'product_search':
-                search_term = entities.get('product_name', 'products')
-                summary_parts.append(f"User searched for {search_term}")
-            else:
-                summary_parts.append(f"User made {intent_type} query")
+        """Get a brief summary of recent conversation (maintained incrementally by add_turn)."""
+        return self._summary
+    
+    @staticmethod
+    def _summarize_turn(intent_result: IntentResult) -> str:
+        """Create a brief summary of a single turn."""
+        intent_type = intent_result.intent_type
+        entities = intent_result.entities
         
-        return "; ".join(summary_parts)
+        if intent_type == 'inventory_management':
+            action = entities.get('action', 'action')
+            product = entities.get('product_name', 'product')
+            quantity = entities.get('quantity', 'some')
+            return f"User performed {action} operation on {product} ({quantity} units)"
+        elif intent_type == 'inventory_query':
+            product = entities.get('product_name', 'products')
+            return f"User queried inventory for {product}"
+        elif intent_type == 'product_search':
+            search_term = entities.get('product_name', 'products')
+            return f"User searched for {search_term}"
+        else:
+            return f"User made {intent_type} query"
     
     def enhance_entities_with_context(self, entities: Dict[str, Any]) -> Dict[str, Any]:
         """Enhance extracted entities with context information."""
         enhanced = entities.copy()
         
         # If no product name was extracted, try to infer from context
-        if not enhanced.get('product_name') and self.last_mentioned_products:
+        last_mentions = self._entity_index.get(LAST_MENTION_KEY)
+        if not enhanced.get('product_name') and last_mentions:
             # Use the most recently mentioned product
-            enhanced['product_name'] = self.last_mentioned_products[-1]
+            enhanced['product_name'] = last_mentions[-1].name
             enhanced['_from_context'] = True
         
         # If no action was specified, try to infer from recent actions
@@ -222,6 +372,44 @@ class ConversationContext:
         
         return enhanced
     
+    def get_prompt_messages(self) -> List[Dict[str, str]]:
+        """Get the chat history to send before the next LLM prompt."""
+        return list(self._prompt_messages)
+    
+    def get_intent_messages(self) -> List[Dict[str, str]]:
+        """Get the chat history to send before the next intent classification prompt."""
+        return list(self._intent_messages)
+    
+    def _append_prompt_turn(self, user_query: str, response: str, intent_result: IntentResult) -> None:
+        """Append a turn to the prompt histories, resetting them when full.
+        
+        The response history restarts from a summary exchange; the intent history
+        restarts empty, since the classifier prompt already carries the summary.
+        """
+        if self._prompt_turns >= self.max_turns:
+            self._prompt_messages = [
+                {"role": "user", "content": f"Summary of our earlier conversation: {self._summary}"},
+                {"role": "assistant", "content": "Understood, I will keep that context in mind."}
+            ]
+            self._intent_messages = []
+            self._prompt_turns = 0
+        
+        self._intent_messages.append({"role": "user", "content": user_query})
+        self._intent_messages.append({"role": "assistant", "content": serialization.dumps({
+            'intent_type': intent_result.intent_type,
+            'confidence': intent_result.confidence,
+            'entities': intent_result.entities,
+            'needs_clarification': intent_result.needs_clarification,
+            'clarification_question': intent_result.clarification_question
+        })})
+        
+        if len(response) > self.PROMPT_RESPONSE_CHARS:
+            response = response[:self.PROMPT_RESPONSE_CHARS] + "..."
+        
+        self._prompt_messages.append({"role": "user", "content": user_query})
+        self._prompt_messages.append({"role": "assistant", "content": response})
+        self._prompt_turns += 1
+    
     def get_recent_history_text(self, turns: int = 3) -> str:
         """Get recent conversation history as text for LLM context."""
         if not self.history:
@@ -238,13 +426,33 @@ class ConversationContext:
         
         return "\n".join(history_text)
     
+    def get_recent_turn_embeddings(self, turns: int = 3) -> List[Any]:
+        """Get query embeddings of recent turns, newest first."""
+        return [
+            turn.embedding for turn in reversed(self.history[-turns:])
+            if turn.embedding is not None
+        ]
+    
     def clear_context(self) -> None:
         """Clear conversation context (useful for new conversations)."""
         self.history.clear()
         self.last_mentioned_products.clear()
         self.last_action_type = None
         self.last_entities = {}
+        self._entity_index.clear()
+        self._summary_parts.clear()
+        self._summary = "No previous conversation"
+        self._prompt_messages = []
+        self._intent_messages = []
+        self._prompt_turns = 0
         self.turn_counter = 0
+        
+        # Forget the persisted conversation too, so it is not restored next time
+        if self._conn is not None:
+            self._conn.execute("DELETE FROM conversation_turns WHERE user_id = ?", (self._user_id,))
+            self._conn.commit()
+        self._saved_turn_id = 0
+        
         self.logger.debug("Conversation context cleared")
     
     def get_stats(self) -> Dict[str, Any]:
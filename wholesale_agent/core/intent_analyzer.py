@@ -41,6 +41,9 @@ class IntentAnalyzer:
             "help_capabilities": "Ask about what the agent can do, available commands, or how to use the system",
             "general": "General questions or unclear requests that need clarification"
         }
+        
+        # Built once: identical across calls so it stays a cacheable prompt prefix
+        self.system_prompt = self._build_system_prompt()
     
     def analyze_intent(self, user_query: str, context: Dict[str, Any] = None) -> IntentResult:
         """Analyze user query to determine intent and extract entities."""
@@ -63,9 +66,11 @@ class IntentAnalyzer:
                 raw_query=user_query
             )
     
-    def _llm_analyze_intent(self, user_query: str, context: Dict[str, Any] = None) -> str:
-        """Use LLM to analyze user intent."""
-        system_prompt = """You are an expert intent classifier for a wholesale business management system. 
+    def _build_system_prompt(self) -> str:
+        """Build the static system prompt, including the intent catalogue."""
+        intents_list = "\n".join([f"- {intent}: {desc}" for intent, desc in self.available_intents.items()])
+        
+        return """You are an expert intent classifier for a wholesale business management system. 
 Your job is to analyze user queries and determine their intent, extract relevant entities, and identify when clarification is needed.
 
 Always respond with a valid JSON object in this exact format:
@@ -110,10 +115,19 @@ IMPORTANT GUIDELINES:
 - Extract entities even if they're incomplete (partial product names, etc.)
 - Use high confidence (0.8+) for clear inventory operations and history queries
 - Use medium confidence (0.5-0.8) for somewhat clear queries  
-- Use low confidence (0.0-0.5) only for truly unclear queries"""
+- Use low confidence (0.0-0.5) only for truly unclear queries
 
-        intents_list = "\n".join([f"- {intent}: {desc}" for intent, desc in self.available_intents.items()])
-        
+CONTEXT HANDLING:
+- Earlier messages in this chat are the previous queries and the JSON you returned for them
+- If the query references "it", "that", or "them" and recent products are available, use the most recent product
+- If this appears to be a follow-up question, consider the previous context
+- For vague references like "check that" or "what about it", infer from recent products/actions
+
+Available intents:
+""" + intents_list
+    
+    def _llm_analyze_intent(self, user_query: str, context: Dict[str, Any] = None) -> str:
+        """Use LLM to analyze user intent."""
         # Add context information if available
         context_info = ""
         if context and context.get('has_history'):
@@ -122,6 +136,9 @@ IMPORTANT GUIDELINES:
             if context.get('recent_products'):
                 context_parts.append(f"Recently mentioned products: {', '.join(context['recent_products'])}")
             
+            if context.get('resolved_product'):
+                context_parts.append(f"Pronouns like 'it' or 'that' refer to: {context['resolved_product']}")
+            
             if context.get('last_action_type'):
                 context_parts.append(f"Last action performed: {context['last_action_type']}")
             
@@ -134,19 +151,15 @@ IMPORTANT GUIDELINES:
             if context_parts:
                 context_info = f"\nConversation Context:\n" + "\n".join([f"- {part}" for part in context_parts])
         
-        prompt = f"""Available intents:
-{intents_list}
+        # Only this final message changes between turns
+        prompt = f"""User Query: "{user_query}"{context_info}
 
-User Query: "{user_query}"{context_info}
-
-Analyze this query and respond with the JSON format specified in the system prompt.
-
-CONTEXT HANDLING:
-- If the query references "it", "that", or "them" and recent products are available, use the most recent product
-- If this appears to be a follow-up question, consider the previous context
-- For vague references like "check that" or "what about it", infer from recent products/actions"""
+Analyze this query and respond with the JSON format specified in the system prompt."""
 
-        return self.llm_client.generate_response(prompt, system_prompt)
+        # Earlier queries paired with the intent JSON returned for them, not the
+        # formatter's prose answers, so the history never pulls the reply off JSON
+        history = context.get('intent_messages') if context else None
+        return self.llm_client.generate_response(prompt, self.system_prompt, history=history)
     
     def _parse_intent_response(self, llm_response: str, original_query: str) -> IntentResult:
         """Parse LLM response into IntentResult."""
@@ -2,8 +2,11 @@
 Inventory management operations for adding, updating, and managing stock.
 """
 import logging
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
+from sqlalchemy import case, func, or_
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
@@ -14,8 +17,48 @@ from ..utils.logger import get_logger
 class InventoryManager:
     """Handles inventory write operations and stock management."""
     
+    PRODUCT_CACHE_SIZE = 1024
+    
     def __init__(self):
         self.logger = get_logger(__name__)
+        self._session: Optional[Session] = None  # Shared session inside session_scope()
+        self._product_ids: "OrderedDict[str, int]" = OrderedDict()  # LRU of identifier -> product id
+    
+    @contextmanager
+    def session_scope(self):
+        """
+        Run several operations in one session and a single transaction.
+        
+        Operations called inside the scope only flush; the transaction is
+        committed on exit and rolled back if an exception escapes.
+        """
+        if self._session is not None:
+            yield self._session
+            return
+        
+        with db_manager.get_session() as session:
+            self._session = session
+            try:
+                yield session
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                self._session = None
+    
+    def _get_session(self):
+        """Get the shared session inside session_scope(), or a new one."""
+        if self._session is not None:
+            return nullcontext(self._session)
+        return db_manager.get_session()
+    
+    def _commit(self, session: Session):
+        """Commit the operation, or only flush it inside session_scope()."""
+        if session is self._session:
+            session.flush()
+        else:
+            session.commit()
     
     def add_stock(self, product_identifier: str, quantity: int, 
                   cost_price: Optional[float] = None, reference: Optional[str] = None,
@@ -40,7 +83,7 @@ class InventoryManager:
             }
         
         try:
-            with db_manager.get_session() as session:
+            with self._get_session() as session:
                 # Find product
                 product = self._find_product(session, product_identifier)
                 if not product:
@@ -65,7 +108,7 @@ class InventoryManager:
                 old_stock = product.current_stock
                 product.current_stock += quantity
                 
-                session.commit()
+                self._commit(session)
                 
                 self.logger.info(f"Added {quantity} units to {product.sku}")
                 
@@ -119,7 +162,7 @@ class InventoryManager:
             }
         
         try:
-            with db_manager.get_session() as session:
+            with self._get_session() as session:
                 # Find product
                 product = self._find_product(session, product_identifier)
                 if not product:
@@ -150,7 +193,7 @@ class InventoryManager:
                 old_stock = product.current_stock
                 product.current_stock -= quantity
                 
-                session.commit()
+                self._commit(session)
                 
                 self.logger.info(f"Removed {quantity} units from {product.sku}")
                 
@@ -196,7 +239,7 @@ class InventoryManager:
             }
         
         try:
-            with db_manager.get_session() as session:
+            with self._get_session() as session:
                 # Find product
                 product = self._find_product(session, product_identifier)
                 if not product:
@@ -227,7 +270,7 @@ class InventoryManager:
                 # Update product stock
                 product.current_stock = new_quantity
                 
-                session.commit()
+                self._commit(session)
                 
                 self.logger.info(f"Adjusted {product.sku} stock from {old_stock} to {new_quantity}")
                 
@@ -276,7 +319,7 @@ class InventoryManager:
             Dict with operation result
         """
         try:
-            with db_manager.get_session() as session:
+            with self._get_session() as session:
                 # Check if SKU already exists
                 existing = session.query(Product).filter(Product.sku == sku).first()
                 if existing:
@@ -329,10 +372,13 @@ class InventoryManager:
                     )
                     session.add(movement)
                 
-                session.commit()
+                self._commit(session)
                 
                 self.logger.info(f"Created new product: {sku}")
                 
+                # A new product can be a better match for identifiers resolved earlier
+                self._product_ids.clear()
+                
                 return {
                     'success': True,
                     'product': {
@@ -362,7 +408,7 @@ class InventoryManager:
                             wholesale_price: Optional[float] = None, retail_price: Optional[float] = None) -> Dict[str, Any]:
         """Update product prices."""
         try:
-            with db_manager.get_session() as session:
+            with self._get_session() as session:
                 product = self._find_product(session, product_identifier)
                 if not product:
                     return {
@@ -384,7 +430,7 @@ class InventoryManager:
                 if retail_price is not None:
                     product.retail_price = retail_price
                 
-                session.commit()
+                self._commit(session)
                 
                 return {
                     'success': True,
@@ -409,14 +455,28 @@ class InventoryManager:
             }
     
     def _find_product(self, session: Session, identifier: str) -> Optional[Product]:
-        """Find product by SKU or name."""
-        # Try exact SKU match first
-        product = session.query(Product).filter(Product.sku == identifier).first()
-        if product:
-            return product
+        """Find product by SKU or name, remembering resolved identifiers."""
+        product_id = self._product_ids.get(identifier)
+        if product_id is not None:
+            product = session.get(Product, product_id)
+            if product:
+                self._product_ids.move_to_end(identifier)
+                return product
+            del self._product_ids[identifier]
         
-        # Try case-insensitive name match
-        product = session.query(Product).filter(Product.name.ilike(identifier)).first()
+        product = self._query_product(session, identifier)
+        if product:
+            self._product_ids[identifier] = product.id
+            if len(self._product_ids) > self.PRODUCT_CACHE_SIZE:
+                self._product_ids.popitem(last=False)
+        return product
+    
+    def _query_product(self, session: Session, identifier: str) -> Optional[Product]:
+        """Look up a product by exact SKU, then case-insensitive name, then partial name."""
+        # Exact SKU or case-insensitive name in one indexed query, SKU preferred
+        product = session.query(Product).filter(
+            or_(Product.sku == identifier, func.lower(Product.name) == identifier.lower())
+        ).order_by(case((Product.sku == identifier, 0), else_=1)).first()
         if product:
             return product
         
@@ -427,7 +487,7 @@ class InventoryManager:
     def get_stock_movements(self, product_identifier: str, limit: int = 10) -> Dict[str, Any]:
         """Get recent stock movements for a product."""
         try:
-            with db_manager.get_session() as session:
+            with self._get_session() as session:
                 product = self._find_product(session, product_identifier)
                 if not product:
                     return {
@@ -4,7 +4,7 @@ Supports multiple LLM providers with fallback options.
 """
 import os
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Iterator, Tuple
 import json
 import requests
 from dataclasses import dataclass
@@ -65,15 +65,25 @@ class LLMClient:
         elif self.config.provider == "anthropic" and not self.config.api_key:
             self.logger.warning("LLM API key not found. LLM functionality will be limited.")
     
-    def generate_response(self, prompt: str, system_prompt: Optional[str] = None) -> str:
-        """Generate response using configured LLM."""
+    def generate_response(self, prompt: str, system_prompt: Optional[str] = None,
+                          history: Optional[List[Dict[str, str]]] = None) -> str:
+        """Generate response using configured LLM.
+        
+        Args:
+            prompt: The new user message
+            system_prompt: Static instructions, sent first
+            history: Earlier {"role", "content"} messages, sent between the system
+                prompt and the new message. Callers keep it append-only so every
+                request shares the same prefix and provider prompt caching applies.
+        """
+        history = history or []
         try:
             if self.config.provider == "openai":
-                return self._generate_openai_response(prompt, system_prompt)
+                return self._generate_openai_response(prompt, system_prompt, history)
             elif self.config.provider == "anthropic":
-                return self._generate_anthropic_response(prompt, system_prompt)
+                return self._generate_anthropic_response(prompt, system_prompt, history)
             elif self.config.provider == "local":
-                return self._generate_local_response(prompt, system_prompt)
+                return self._generate_local_response(prompt, system_prompt, history)
             else:
                 raise ValueError(f"Unsupported LLM provider: {self.config.provider}")
         
@@ -81,8 +91,25 @@ class LLMClient:
             self.logger.error(f"Error generating LLM response: {str(e)}")
             raise
     
-    def _generate_openai_response(self, prompt: str, system_prompt: Optional[str] = None) -> str:
-        """Generate response using OpenAI API."""
+    def stream_response(self, prompt: str, system_prompt: Optional[str] = None,
+                        history: Optional[List[Dict[str, str]]] = None) -> Iterator[str]:
+        """Generate response using configured LLM, yielding text chunks as they arrive.
+        
+        Takes the same arguments as generate_response.
+        """
+        history = history or []
+        if self.config.provider == "openai":
+            return self._stream_openai_response(prompt, system_prompt, history)
+        elif self.config.provider == "anthropic":
+            return self._stream_anthropic_response(prompt, system_prompt, history)
+        elif self.config.provider == "local":
+            return self._stream_local_response(prompt, system_prompt, history)
+        else:
+            raise ValueError(f"Unsupported LLM provider: {self.config.provider}")
+    
+    def _openai_request(self, prompt: str, system_prompt: Optional[str] = None,
+                        history: Optional[List[Dict[str, str]]] = None) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """Build URL, headers and payload for the OpenAI API (prefix caching is automatic)."""
         if not self.config.api_key:
             raise ValueError("LLM API key not configured")
         
@@ -91,6 +118,7 @@ class LLMClient:
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
+        messages.extend(history or [])
         messages.append({"role": "user", "content": prompt})
         
         headers = {
@@ -104,6 +132,12 @@ class LLMClient:
             "max_tokens": self.config.max_tokens,
             "temperature": self.config.temperature
         }
+        return url, headers, data
+    
+    def _generate_openai_response(self, prompt: str, system_prompt: Optional[str] = None,
+                                  history: Optional[List[Dict[str, str]]] = None) -> str:
+        """Generate response using OpenAI API."""
+        url, headers, data = self._openai_request(prompt, system_prompt, history)
         
         response = requests.post(url, headers=headers, json=data, timeout=30)
         response.raise_for_status()
@@ -111,8 +145,29 @@ class LLMClient:
         result = response.json()
         return result["choices"][0]["message"]["content"]
     
-    def _generate_anthropic_response(self, prompt: str, system_prompt: Optional[str] = None) -> str:
-        """Generate response using Anthropic Claude API."""
+    def _stream_openai_response(self, prompt: str, system_prompt: Optional[str] = None,
+                                history: Optional[List[Dict[str, str]]] = None) -> Iterator[str]:
+        """Stream response chunks from the OpenAI API (server-sent events)."""
+        url, headers, data = self._openai_request(prompt, system_prompt, history)
+        data["stream"] = True
+        
+        with requests.post(url, headers=headers, json=data, timeout=30, stream=True) as response:
+            response.raise_for_status()
+            for event in self._iter_sse_data(response):
+                if event == "[DONE]":
+                    break
+                choices = json.loads(event).get("choices") or [{}]
+                content = choices[0].get("delta", {}).get("content")
+                if content:
+                    yield content
+    
+    def _anthropic_request(self, prompt: str, system_prompt: Optional[str] = None,
+                           history: Optional[List[Dict[str, str]]] = None) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """Build URL, headers and payload for the Anthropic Claude API.
+        
+        The system prompt and the end of the history are marked as cache
+        breakpoints so the shared prefix is read from the prompt cache.
+        """
         if not self.config.api_key:
             raise ValueError("LLM API key not configured")
         
@@ -124,7 +179,14 @@ class LLMClient:
             "anthropic-version": "2023-06-01"
         }
         
-        messages = [{"role": "user", "content": prompt}]
+        messages = [dict(message) for message in history or []]
+        if messages:
+            messages[-1]["content"] = [{
+                "type": "text",
+                "text": messages[-1]["content"],
+                "cache_control": {"type": "ephemeral"}
+            }]
+        messages.append({"role": "user", "content": prompt})
         
         data = {
             "model": self.config.model or "claude-3-sonnet-20240229",
@@ -133,7 +195,17 @@ class LLMClient:
         }
         
         if system_prompt:
-            data["system"] = system_prompt
+            data["system"] = [{
+                "type": "text",
+                "text": system_prompt,
+                "cache_control": {"type": "ephemeral"}
+            }]
+        return url, headers, data
+    
+    def _generate_anthropic_response(self, prompt: str, system_prompt: Optional[str] = None,
+                                     history: Optional[List[Dict[str, str]]] = None) -> str:
+        """Generate response using Anthropic Claude API."""
+        url, headers, data = self._anthropic_request(prompt, system_prompt, history)
         
         response = requests.post(url, headers=headers, json=data, timeout=30)
         response.raise_for_status()
@@ -141,13 +213,36 @@ class LLMClient:
         result = response.json()
         return result["content"][0]["text"]
     
-    def _generate_local_response(self, prompt: str, system_prompt: Optional[str] = None) -> str:
-        """Generate response using local LLM (e.g., Ollama)."""
+    def _stream_anthropic_response(self, prompt: str, system_prompt: Optional[str] = None,
+                                   history: Optional[List[Dict[str, str]]] = None) -> Iterator[str]:
+        """Stream response chunks from the Anthropic Claude API (server-sent events)."""
+        url, headers, data = self._anthropic_request(prompt, system_prompt, history)
+        data["stream"] = True
+        
+        with requests.post(url, headers=headers, json=data, timeout=30, stream=True) as response:
+            response.raise_for_status()
+            for event in self._iter_sse_data(response):
+                payload = json.loads(event)
+                if payload.get("type") == "content_block_delta":
+                    text = payload.get("delta", {}).get("text")
+                    if text:
+                        yield text
+                elif payload.get("type") == "message_stop":
+                    break
+    
+    def _local_request(self, prompt: str, system_prompt: Optional[str] = None,
+                       history: Optional[List[Dict[str, str]]] = None) -> Tuple[str, Dict[str, Any]]:
+        """Build URL and payload for a local LLM (e.g., Ollama).
+        
+        History is rendered after the system prompt, so consecutive requests
+        share a text prefix and the server can reuse its KV cache.
+        """
         url = self.config.base_url or "http://localhost:11434/api/generate"
         
-        full_prompt = prompt
-        if system_prompt:
-            full_prompt = f"{system_prompt}\n\n{prompt}"
+        parts = [system_prompt] if system_prompt else []
+        parts.extend(f"{message['role'].capitalize()}: {message['content']}" for message in history or [])
+        parts.append(prompt)
+        full_prompt = "\n\n".join(parts)
         
         data = {
             "model": self.config.model or "llama2",
@@ -157,6 +252,12 @@ class LLMClient:
                 "temperature": self.config.temperature
             }
         }
+        return url, data
+    
+    def _generate_local_response(self, prompt: str, system_prompt: Optional[str] = None,
+                                 history: Optional[List[Dict[str, str]]] = None) -> str:
+        """Generate response using local LLM (e.g., Ollama)."""
+        url, data = self._local_request(prompt, system_prompt, history)
         
         response = requests.post(url, json=data, timeout=60)
         response.raise_for_status()
@@ -164,6 +265,30 @@ class LLMClient:
         result = response.json()
         return result.get("response", "")
     
+    def _stream_local_response(self, prompt: str, system_prompt: Optional[str] = None,
+                               history: Optional[List[Dict[str, str]]] = None) -> Iterator[str]:
+        """Stream response chunks from a local LLM (newline-delimited JSON)."""
+        url, data = self._local_request(prompt, system_prompt, history)
+        data["stream"] = True
+        
+        with requests.post(url, json=data, timeout=60, stream=True) as response:
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("response"):
+                    yield chunk["response"]
+                if chunk.get("done"):
+                    break
+    
+    @staticmethod
+    def _iter_sse_data(response) -> Iterator[str]:
+        """Yield the data field of each server-sent event in a streaming response."""
+        for line in response.iter_lines(decode_unicode=True):
+            if line and line.startswith("data:"):
+                yield line[len("data:"):].strip()
+    
     def is_available(self) -> bool:
         """Check if LLM service is available."""
         try:
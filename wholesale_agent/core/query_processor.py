@@ -2,9 +2,30 @@
 Query processing and intent recognition for wholesale agent.
 """
 import re
+from collections import OrderedDict
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
 
+# Words ignored by keyword extraction
+_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
+    'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
+    'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these',
+    'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him',
+    'her', 'us', 'them', 'my', 'your', 'his', 'her', 'its', 'our', 'their'
+})
+
+_WORD_RE = re.compile(r'\b\w+\b')
+_SEARCH_FILLER_RE = re.compile(
+    r'\b(?:find|search|look for|show me|product|item|information|about|tell me)\b',
+    re.IGNORECASE
+)
+_PROBLEMATIC_QUERY_RES = (
+    re.compile(r'^\s*[0-9\s\+\-\*\/\(\)]+\s*$'),  # Only math expressions
+    re.compile(r'^[^a-zA-Z]*$')  # No alphabetic characters
+)
+
 
 @dataclass
 class QueryIntent:
@@ -18,7 +39,10 @@ class QueryIntent:
 class QueryProcessor:
     """Processes user queries to understand intent and extract entities."""
     
+    INTENT_CACHE_SIZE = 512
+    
     def __init__(self):
+        self._intent_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()  # LRU of query -> analysis
         self.intent_patterns = {
             'inventory_query': [
                 r'(?:how much|how many|stock|inventory|quantity).+(?:do we have|in stock|available)',
@@ -109,9 +133,50 @@ class QueryProcessor:
                 r'price:?\s*\$?(\d+(?:\.\d{2})?)'
             ]
         }
+        
+        self._compile_patterns()
+    
+    def _compile_patterns(self):
+        """Compile the pattern tables once instead of on every query."""
+        self._intent_res = {
+            intent: [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+            for intent, patterns in self.intent_patterns.items()
+        }
+        self._entity_res = {
+            entity_type: [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+            for entity_type, patterns in self.entity_patterns.items()
+        }
     
     def analyze_intent(self, query: str) -> Dict[str, Any]:
-        """Analyze user query to determine intent and extract entities."""
+        """Analyze user query to determine intent and extract entities.
+        
+        Results are cached per query string; callers get their own copy.
+        """
+        analysis = self._intent_cache.get(query)
+        if analysis is not None:
+            self._intent_cache.move_to_end(query)
+        else:
+            analysis = self._analyze_intent(query)
+            self._intent_cache[query] = analysis
+            if len(self._intent_cache) > self.INTENT_CACHE_SIZE:
+                self._intent_cache.popitem(last=False)
+        
+        return {
+            **analysis,
+            'entities': dict(analysis['entities']),
+            'keywords': list(analysis['keywords'])
+        }
+    
+    def clear_cache(self):
+        """Recompile the pattern tables and forget cached analyses.
+        
+        Call this after changing intent_patterns or entity_patterns.
+        """
+        self._compile_patterns()
+        self._intent_cache.clear()
+    
+    def _analyze_intent(self, query: str) -> Dict[str, Any]:
+        """Classify the query and extract its entities and keywords."""
         query_lower = query.lower().strip()
         
         # Determine intent
@@ -134,10 +199,10 @@ class QueryProcessor:
         """Classify the intent of the user query."""
         intent_scores = {}
         
-        for intent, patterns in self.intent_patterns.items():
+        for intent, patterns in self._intent_res.items():
             score = 0
             for pattern in patterns:
-                if re.search(pattern, query, re.IGNORECASE):
+                if pattern.search(query):
                     score += 1
             
             if score > 0:
@@ -153,9 +218,9 @@ class QueryProcessor:
         """Extract relevant entities from the query."""
         entities = {}
         
-        for entity_type, patterns in self.entity_patterns.items():
+        for entity_type, patterns in self._entity_res.items():
             for pattern in patterns:
-                matches = re.findall(pattern, query, re.IGNORECASE)
+                matches = pattern.findall(query)
                 if matches:
                     # Take the first match for simplicity
                     entities[entity_type] = matches[0].strip()
@@ -166,10 +231,7 @@ class QueryProcessor:
             # If no explicit product name found, use the whole query as search term
             if 'product_name' not in entities:
                 # Remove common query words to get search term
-                search_term = re.sub(
-                    r'\b(?:find|search|look for|show me|product|item|information|about|tell me)\b',
-                    '', query, flags=re.IGNORECASE
-                ).strip()
+                search_term = _SEARCH_FILLER_RE.sub('', query).strip()
                 if search_term:
                     entities['search_term'] = search_term
         
@@ -177,21 +239,11 @@ class QueryProcessor:
     
     def _extract_keywords(self, query: str) -> List[str]:
         """Extract important keywords from the query."""
-        # Remove common stop words and extract meaningful terms
-        stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-            'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
-            'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
-            'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these',
-            'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him',
-            'her', 'us', 'them', 'my', 'your', 'his', 'her', 'its', 'our', 'their'
-        }
-        
         # Extract words, filter out stop words and short words
-        words = re.findall(r'\b\w+\b', query.lower())
+        words = _WORD_RE.findall(query.lower())
         keywords = [
             word for word in words 
-            if len(word) > 2 and word not in stop_words
+            if len(word) > 2 and word not in _STOP_WORDS
         ]
         
         return list(set(keywords))  # Remove duplicates
@@ -236,13 +288,8 @@ class QueryProcessor:
             }
         
         # Check for potentially problematic queries
-        problematic_patterns = [
-            r'^\s*[0-9\s\+\-\*\/\(\)]+\s*$',  # Only math expressions
-            r'^[^a-zA-Z]*$'  # No alphabetic characters
-        ]
-        
-        for pattern in problematic_patterns:
-            if re.match(pattern, query):
+        for pattern in _PROBLEMATIC_QUERY_RES:
+            if pattern.match(query):
                 return {
                     'valid': False,
                     'reason': 'Query format not supported'
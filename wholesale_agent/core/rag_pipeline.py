@@ -3,18 +3,20 @@ RAG (Retrieval-Augmented Generation) pipeline for wholesale agent.
 Useful for unstructured data like product descriptions, supplier docs, etc.
 """
 import os
+import math
+from importlib.util import find_spec
 from typing import List, Dict, Any, Optional
 import json
 from pathlib import Path
 import numpy as np
 from dataclasses import dataclass
 
-try:
-    from sentence_transformers import SentenceTransformer
-    import faiss
-    EMBEDDINGS_AVAILABLE = True
-except ImportError:
-    EMBEDDINGS_AVAILABLE = False
+# Probe for the heavy dependencies without importing them (torch alone takes seconds);
+# they are imported on first use.
+EMBEDDINGS_AVAILABLE = (
+    find_spec('sentence_transformers') is not None and find_spec('faiss') is not None
+)
+if not EMBEDDINGS_AVAILABLE:
     print("Warning: sentence-transformers and faiss not installed. RAG features disabled.")
 
 from ..models import db_manager, Product, Category, Supplier
@@ -37,13 +39,15 @@ class EmbeddingGenerator:
         if not EMBEDDINGS_AVAILABLE:
             raise ImportError("sentence-transformers not installed. Install with: pip install sentence-transformers faiss-cpu")
         
+        from sentence_transformers import SentenceTransformer
         self.model = SentenceTransformer(model_name)
         self.logger = get_logger(__name__)
     
-    def generate_embeddings(self, texts: List[str]) -> np.ndarray:
+    def generate_embeddings(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
         """Generate embeddings for a list of texts."""
         try:
-            embeddings = self.model.encode(texts, convert_to_tensor=False, show_progress_bar=True)
+            embeddings = self.model.encode(texts, batch_size=batch_size, convert_to_tensor=False,
+                                           show_progress_bar=len(texts) > batch_size)
             return np.array(embeddings)
         except Exception as e:
             self.logger.error(f"Error generating embeddings: {e}")
@@ -51,12 +55,24 @@ class EmbeddingGenerator:
 
 
 class VectorStore:
-    """Vector store using FAISS for similarity search."""
+    """Vector store using FAISS for similarity search.
+    
+    The index type is chosen when the first batch of documents is added:
+    HNSW for small catalogs, IVF-PQ once there is enough data to train it.
+    """
+    
+    IVF_PQ_MIN_DOCUMENTS = 10000  # faiss wants ~39 training vectors per PQ centroid (2**8)
+    HNSW_M = 32
+    HNSW_EF_SEARCH = 64
+    PQ_M = 16
+    PQ_NBITS = 8
+    IVF_NPROBE = 8
     
     def __init__(self, dimension: int = 384):
         if not EMBEDDINGS_AVAILABLE:
             raise ImportError("faiss not installed. Install with: pip install faiss-cpu")
         
+        import faiss
         self.dimension = dimension
         self.index = faiss.IndexFlatIP(dimension)  # Inner product for cosine similarity
         self.documents = []
@@ -74,39 +90,82 @@ class VectorStore:
             self.logger.warning("No embeddings found in documents")
             return
         
+        import faiss
+        
         # Normalize embeddings for cosine similarity
+        embeddings = np.ascontiguousarray(embeddings, dtype='float32')
         faiss.normalize_L2(embeddings)
         
+        # Pick an approximate index for the first batch
+        if self.index.ntotal == 0:
+            self.index = self._build_index(embeddings)
+        
         # Add to index
-        self.index.add(embeddings.astype('float32'))
+        self.index.add(embeddings)
         self.documents.extend(documents)
         
         self.logger.info(f"Added {len(embeddings)} documents to vector store")
     
+    def _build_index(self, embeddings: np.ndarray):
+        """Build (and train, if needed) an inner-product index sized for the embeddings."""
+        import faiss
+        
+        n = len(embeddings)
+        if n >= self.IVF_PQ_MIN_DOCUMENTS and self.dimension % self.PQ_M == 0:
+            nlist = max(1, int(math.sqrt(n)))
+            quantizer = faiss.IndexFlatIP(self.dimension)
+            index = faiss.IndexIVFPQ(quantizer, self.dimension, nlist, self.PQ_M, self.PQ_NBITS,
+                                     faiss.METRIC_INNER_PRODUCT)
+            index.train(embeddings)
+            self.logger.info(f"Using IVF-PQ index (nlist={nlist}) for {n} documents")
+        else:
+            index = faiss.IndexHNSWFlat(self.dimension, self.HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            self.logger.info(f"Using HNSW index for {n} documents")
+        
+        self._configure_search(index)
+        return index
+    
+    def _configure_search(self, index):
+        """Apply query-time search parameters to an index."""
+        if hasattr(index, 'nprobe'):
+            index.nprobe = self.IVF_NPROBE
+        if hasattr(index, 'hnsw'):
+            index.hnsw.efSearch = self.HNSW_EF_SEARCH
+    
     def search(self, query_embedding: np.ndarray, k: int = 5) -> List[tuple]:
         """Search for similar documents."""
+        return self.search_batch(query_embedding.reshape(1, -1), k)[0]
+    
+    def search_batch(self, query_embeddings: np.ndarray, k: int = 5) -> List[List[tuple]]:
+        """Search for similar documents for every row of a query matrix in one call."""
         if self.index.ntotal == 0:
-            return []
+            return [[] for _ in range(len(query_embeddings))]
         
-        # Normalize query embedding
-        query_embedding = query_embedding.reshape(1, -1).astype('float32')
-        faiss.normalize_L2(query_embedding)
+        import faiss
         
-        # Search
-        scores, indices = self.index.search(query_embedding, k)
-        
-        results = []
-        for score, idx in zip(scores[0], indices[0]):
-            if idx < len(self.documents):
-                results.append((self.documents[idx], float(score)))
+        # Normalize query embeddings
+        query_embeddings = np.ascontiguousarray(query_embeddings, dtype='float32')
+        faiss.normalize_L2(query_embeddings)
         
-        return results
+        # Search
+        scores, indices = self.index.search(query_embeddings, k)
+        
+        return [
+            [
+                (self.documents[idx], float(score))
+                for score, idx in zip(row_scores, row_indices)
+                if 0 <= idx < len(self.documents)
+            ]
+            for row_scores, row_indices in zip(scores, indices)
+        ]
     
     def save(self, filepath: str):
         """Save vector store to disk."""
         index_path = f"{filepath}.index"
         docs_path = f"{filepath}.docs"
         
+        import faiss
+        
         # Save FAISS index
         faiss.write_index(self.index, index_path)
         
@@ -133,8 +192,11 @@ class VectorStore:
         if not (Path(index_path).exists() and Path(docs_path).exists()):
             raise FileNotFoundError(f"Vector store files not found at {filepath}")
         
+        import faiss
+        
         # Load FAISS index
         self.index = faiss.read_index(index_path)
+        self._configure_search(self.index)
         
         # Load documents
         with open(docs_path, 'r') as f:
@@ -156,16 +218,31 @@ class RAGPipeline:
     """Complete RAG pipeline for wholesale agent."""
     
     def __init__(self, embedding_model: str = "all-MiniLM-L6-v2"):
+        self.logger = get_logger(__name__)
+        self.embedding_model = embedding_model
+        self._embedding_generator = None
+        self._vector_store = None
+        
         if not EMBEDDINGS_AVAILABLE:
-            self.logger = get_logger(__name__)
             self.logger.warning("RAG pipeline disabled - missing dependencies")
             self.enabled = False
             return
         
         self.enabled = True
-        self.embedding_generator = EmbeddingGenerator(embedding_model)
-        self.vector_store = VectorStore()
-        self.logger = get_logger(__name__)
+    
+    @property
+    def embedding_generator(self) -> EmbeddingGenerator:
+        """Embedding model, loaded on first use."""
+        if self._embedding_generator is None:
+            self._embedding_generator = EmbeddingGenerator(self.embedding_model)
+        return self._embedding_generator
+    
+    @property
+    def vector_store(self) -> VectorStore:
+        """Vector store, created on first use."""
+        if self._vector_store is None:
+            self._vector_store = VectorStore()
+        return self._vector_store
     
     def index_product_data(self):
         """Index product data for RAG retrieval."""
@@ -282,26 +359,32 @@ class RAGPipeline:
     
     def search_relevant_context(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
         """Search for relevant context using RAG."""
-        if not self.enabled or self.vector_store.index.ntotal == 0:
-            return []
+        return self.search_batch([query], k)[0]
+    
+    def search_batch(self, queries: List[str], k: int = 5) -> List[List[Dict[str, Any]]]:
+        """Search relevant context for several queries with one encode and one index search."""
+        if not self.enabled or self._vector_store is None or self._vector_store.index.ntotal == 0:
+            return [[] for _ in queries]
         
-        # Generate query embedding
-        query_embedding = self.embedding_generator.generate_embeddings([query])[0]
+        # Generate all query embeddings in a single batch
+        query_embeddings = self.embedding_generator.generate_embeddings(queries)
         
         # Search vector store
-        results = self.vector_store.search(query_embedding, k)
+        batch_results = self.vector_store.search_batch(query_embeddings, k)
         
         # Format results
-        context_docs = []
-        for doc, score in results:
-            context_docs.append({
-                'content': doc.content,
-                'metadata': doc.metadata,
-                'relevance_score': score,
-                'type': doc.metadata.get('type', 'unknown')
-            })
-        
-        return context_docs
+        return [
+            [
+                {
+                    'content': doc.content,
+                    'metadata': doc.metadata,
+                    'relevance_score': score,
+                    'type': doc.metadata.get('type', 'unknown')
+                }
+                for doc, score in results
+            ]
+            for results in batch_results
+        ]
     
     def get_rag_enhanced_context(self, query: str, traditional_context: Dict[str, Any]) -> Dict[str, Any]:
         """Enhance traditional context with RAG-retrieved information."""
@@ -345,7 +428,7 @@ class RAGPipeline:
         if not self.enabled:
             return
         
-        self.vector_store = VectorStore()  # Reset
+        self._vector_store = VectorStore()  # Reset
         self.index_product_data()
         self.save_index()
 
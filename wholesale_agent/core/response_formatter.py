@@ -4,7 +4,7 @@ Takes structured data and formats it into beautiful, user-friendly responses.
 """
 import json
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Iterator, Tuple
 
 from .llm_client import LLMClient
 from .action_executor import ActionResult
@@ -35,8 +35,42 @@ class ResponseFormatter:
             self.logger.error(f"Response formatting error: {str(e)}")
             return self._fallback_response(action_result)
     
+    def stream_response(self, user_query: str, action_result: ActionResult,
+                        context: Dict[str, Any] = None) -> Iterator[str]:
+        """Format action result like format_response, yielding LLM output as it streams in."""
+        # Clarifications and errors need no LLM round-trip
+        if action_result.action_type == "clarification" or (not action_result.success and action_result.error):
+            yield self.format_response(user_query, action_result, context)
+            return
+        
+        prompt, system_prompt = self._build_prompt(user_query, action_result, context)
+        history = context.get('messages') if context else None
+        
+        streamed = False
+        try:
+            for chunk in self.llm_client.stream_response(prompt, system_prompt, history=history):
+                streamed = True
+                yield chunk
+        except Exception as e:
+            self.logger.error(f"LLM streaming error: {str(e)}")
+            if not streamed:
+                yield self._fallback_response(action_result)
+    
     def _llm_format_response(self, user_query: str, action_result: ActionResult, context: Dict[str, Any] = None) -> str:
         """Use LLM to format the response beautifully."""
+        prompt, system_prompt = self._build_prompt(user_query, action_result, context)
+        
+        try:
+            history = context.get('messages') if context else None
+            response = self.llm_client.generate_response(prompt, system_prompt, history=history)
+            return response.strip()
+        except Exception as e:
+            self.logger.error(f"LLM formatting error: {str(e)}")
+            return self._fallback_response(action_result)
+    
+    def _build_prompt(self, user_query: str, action_result: ActionResult,
+                      context: Dict[str, Any] = None) -> Tuple[str, str]:
+        """Build the (prompt, system_prompt) pair for formatting an action result."""
         system_prompt = """You are a professional assistant for a wholesale business management system. 
 Your job is to take structured business data and present it in a clear, helpful, and console-friendly way to users.
 
@@ -99,12 +133,7 @@ Data:
 Please format this information into a helpful, well-structured response for the user. Focus on presenting the data clearly and providing any relevant business insights.
 If this is a follow-up query, acknowledge the context naturally in your response."""
 
-        try:
-            response = self.llm_client.generate_response(prompt, system_prompt)
-            return response.strip()
-        except Exception as e:
-            self.logger.error(f"LLM formatting error: {str(e)}")
-            return self._fallback_response(action_result)
+        return prompt, system_prompt
     
     def _format_data_for_llm(self, data: Any) -> str:
         """Format data in a way that's easy for LLM to process."""
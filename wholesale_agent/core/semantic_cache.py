@@ -0,0 +1,171 @@
+"""
+Context-aware semantic response cache for wholesale agent.
+Serves repeated or near-duplicate queries without another LLM round-trip.
+"""
+import os
+import time
+import sqlite3
+from importlib.util import find_spec
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from ..utils.logger import get_logger
+from ..utils import serialization
+
+# Probe for the heavy dependencies without importing them (torch alone takes seconds);
+# they are imported when a SemanticCache is created.
+CACHE_AVAILABLE = (
+    find_spec('sentence_transformers') is not None and find_spec('faiss') is not None
+)
+
+
+class SemanticCache:
+    """Semantic cache keyed on the query blended with recent conversation turns.
+
+    The lookup vector is alpha * embed(query) + (1 - alpha) * sum(decay^i * embed(turn_i)),
+    so the same words asked in a different conversation context map to a different entry.
+    Entries are kept in a FAISS inner-product index and persisted to SQLite.
+    """
+
+    # Actions that change data or need user input must always run for real
+    NON_CACHEABLE_ACTIONS = {'inventory_management', 'clarification', 'error', 'unknown'}
+
+    # Read-only actions whose results include stock levels (or values derived from
+    # them). Writes made through the agent clear the cache, but stock can also change
+    # outside it (scripts, other users), so these entries expire after live_ttl_seconds.
+    LIVE_STOCK_ACTIONS = {
+        'inventory_query', 'inventory_listing', 'inventory_overview', 'inventory_history',
+        'low_stock_alert', 'product_search', 'price_query', 'analytics'
+    }
+
+    def __init__(self, alpha: float = 0.7, decay: float = 0.8, threshold: float = 0.93,
+                 ttl_seconds: int = 300, live_ttl_seconds: int = 60, history_turns: int = 3,
+                 db_path: str = "~/.wholesale_agent/cache.sqlite",
+                 embedding_model: str = "all-MiniLM-L6-v2"):
+        if not CACHE_AVAILABLE:
+            raise ImportError("sentence-transformers not installed. Install with: pip install sentence-transformers faiss-cpu")
+
+        self.alpha = alpha
+        self.decay = decay
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.live_ttl_seconds = live_ttl_seconds
+        self.history_turns = history_turns
+        self.logger = get_logger(__name__)
+
+        from sentence_transformers import SentenceTransformer
+        import faiss
+
+        self.model = SentenceTransformer(embedding_model)
+        self.dimension = self.model.get_sentence_embedding_dimension()
+        self.index = faiss.IndexFlatIP(self.dimension)
+        self.entries: List[Dict[str, Any]] = []
+
+        self.db_path = os.path.expanduser(db_path)
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS semantic_cache (
+                id INTEGER PRIMARY KEY,
+                vector BLOB NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+        self._load()
+
+    def embed(self, text: str) -> "np.ndarray":
+        """Embed a single text as a normalized float32 vector."""
+        embedding = self.model.encode([text], convert_to_tensor=False, show_progress_bar=False)
+        return self._normalize(np.asarray(embedding[0], dtype='float32'))
+
+    def lookup_vector(self, query_embedding: "np.ndarray",
+                      turn_embeddings: List["np.ndarray"]) -> "np.ndarray":
+        """Blend the query embedding with decayed embeddings of recent turns (newest first)."""
+        if not turn_embeddings:
+            return query_embedding
+
+        history = np.zeros(self.dimension, dtype='float32')
+        for i, embedding in enumerate(turn_embeddings[:self.history_turns]):
+            history += (self.decay ** i) * embedding
+
+        return self._normalize(self.alpha * query_embedding + (1 - self.alpha) * self._normalize(history))
+
+    def get(self, lookup_vector: "np.ndarray") -> Optional[Dict[str, Any]]:
+        """Return the freshest cached payload within the similarity threshold, if any."""
+        if self.index.ntotal == 0:
+            return None
+
+        scores, indices = self.index.search(lookup_vector.reshape(1, -1), min(5, self.index.ntotal))
+        now = time.time()
+
+        best = None
+        for score, idx in zip(scores[0], indices[0]):
+            if idx < 0 or score < self.threshold:
+                continue
+            entry = self.entries[idx]
+            if now > entry['expires_at']:
+                continue
+            if best is None or entry['created_at'] > best['created_at']:
+                best = entry
+
+        if best is not None:
+            self.logger.debug("Semantic cache hit")
+            return best['payload']
+        return None
+
+    def put(self, lookup_vector: "np.ndarray", payload: Dict[str, Any],
+            ttl_seconds: Optional[float] = None) -> None:
+        """Store a payload under the given lookup vector for ttl_seconds (default: ttl_seconds)."""
+        created_at = time.time()
+        expires_at = created_at + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        self.index.add(lookup_vector.reshape(1, -1))
+        self.entries.append({'payload': payload, 'created_at': created_at, 'expires_at': expires_at})
+
+        self._conn.execute(
+            "INSERT INTO semantic_cache (vector, payload, created_at, expires_at) VALUES (?, ?, ?, ?)",
+            (lookup_vector.tobytes(), serialization.dumps(payload), created_at, expires_at)
+        )
+        self._conn.commit()
+
+    def is_cacheable(self, action_type: str, success: bool) -> bool:
+        """Check whether a result is safe to serve again without re-executing it."""
+        return success and action_type not in self.NON_CACHEABLE_ACTIONS
+
+    def ttl_for(self, action_type: str) -> float:
+        """Seconds a result of the given action type may be served from the cache."""
+        return self.live_ttl_seconds if action_type in self.LIVE_STOCK_ACTIONS else self.ttl_seconds
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        self.index.reset()
+        self.entries.clear()
+        self._conn.execute("DELETE FROM semantic_cache")
+        self._conn.commit()
+
+    def _load(self) -> None:
+        """Load unexpired entries from SQLite into the in-memory index."""
+        self._conn.execute("DELETE FROM semantic_cache WHERE expires_at < ?", (time.time(),))
+        self._conn.commit()
+
+        rows = self._conn.execute(
+            "SELECT vector, payload, created_at, expires_at FROM semantic_cache ORDER BY id"
+        ).fetchall()
+        if not rows:
+            return
+
+        vectors = np.vstack([np.frombuffer(vector, dtype='float32') for vector, _, _, _ in rows])
+        self.index.add(vectors)
+        self.entries = [
+            {'payload': serialization.loads(payload), 'created_at': created_at, 'expires_at': expires_at}
+            for _, payload, created_at, expires_at in rows
+        ]
+        self.logger.info(f"Loaded {len(rows)} semantic cache entries")
+
+    @staticmethod
+    def _normalize(vector: "np.ndarray") -> "np.ndarray":
+        norm = np.linalg.norm(vector)
+        return (vector / norm).astype('float32') if norm > 0 else vector.astype('float32')
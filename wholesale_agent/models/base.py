@@ -1,11 +1,14 @@
 """
 Base database model and configuration.
 """
+from contextlib import ExitStack
 from datetime import datetime
 from typing import Optional
 from sqlalchemy import Column, DateTime, Integer, create_engine, MetaData
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import StaticPool
 import os
 
 Base = declarative_base()
@@ -31,10 +34,49 @@ class DatabaseManager:
         )
         self.engine = create_engine(
             self.database_url,
-            echo=os.getenv('DEBUG', 'false').lower() == 'true'
+            echo=os.getenv('DEBUG', 'false').lower() == 'true',
+            **self._pool_options(self.database_url)
         )
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
     
+    @staticmethod
+    def _pool_options(database_url: str) -> dict:
+        """Connection pool settings for the given database URL.
+        
+        Server databases get a QueuePool sized (cores * 2) + 1 with pre-ping and
+        recycling; override with WA_POOL_SIZE / WA_POOL_RECYCLE.
+        """
+        url = make_url(database_url)
+        if url.get_backend_name() == 'sqlite':
+            if url.database in (None, '', ':memory:'):
+                # One shared connection, otherwise each checkout sees an empty database
+                return {'poolclass': StaticPool, 'connect_args': {'check_same_thread': False}}
+            # File-backed SQLite: pooled connections may be used from executor threads
+            return {'connect_args': {'check_same_thread': False}}
+        
+        return {
+            'pool_size': int(os.getenv('WA_POOL_SIZE', (os.cpu_count() or 1) * 2 + 1)),
+            'max_overflow': 10,
+            'pool_timeout': 10,
+            'pool_recycle': int(os.getenv('WA_POOL_RECYCLE', 1800)),
+            'pool_pre_ping': True,
+        }
+    
+    def warmup(self, connections: int = 2):
+        """Open pooled connections ahead of first use.
+        
+        Holds ``connections`` checkouts at once (capped at the pool size) and
+        returns them, so later sessions reuse open connections instead of
+        connecting. No-op for pools without a fixed size, such as StaticPool.
+        """
+        pool_size = getattr(self.engine.pool, 'size', None)
+        if pool_size is None:
+            return
+        
+        with ExitStack() as stack:
+            for _ in range(min(connections, pool_size())):
+                stack.enter_context(self.engine.connect())
+    
     def create_tables(self):
         """Create all database tables."""
         Base.metadata.create_all(bind=self.engine)
@@ -1,7 +1,7 @@
 """
 Inventory and product models for wholesale business.
 """
-from sqlalchemy import Column, String, Integer, Float, Text, ForeignKey, Boolean, Index
+from sqlalchemy import Column, String, Integer, Float, Text, ForeignKey, Boolean, Index, func
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
@@ -79,6 +79,7 @@ class Product(BaseModel):
         Index('idx_product_sku_active', 'sku', 'is_active'),
         Index('idx_product_category_active', 'category_id', 'is_active'),
         Index('idx_product_supplier_active', 'supplier_id', 'is_active'),
+        Index('idx_product_name_lower', func.lower(name)),  # Case-insensitive name lookups
     )
     
     @property
@@ -89,11 +90,13 @@ class Product(BaseModel):
     @property
     def stock_status(self):
         """Get stock status as string."""
-        if self.current_stock <= 0:
+        # Read the instrumented column once instead of once per comparison
+        current_stock = self.current_stock
+        if current_stock <= 0:
             return "OUT_OF_STOCK"
-        elif self.is_low_stock:
+        elif current_stock <= self.minimum_stock:
             return "LOW_STOCK"
-        elif self.current_stock >= self.maximum_stock:
+        elif current_stock >= self.maximum_stock:
             return "OVERSTOCKED"
         else:
             return "IN_STOCK"
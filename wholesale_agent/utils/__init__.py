@@ -1,10 +1,16 @@
 """
 Utility modules for wholesale agent.
 """
+from .._lazy import make_lazy_getattr
 from .config import Config, load_config
 from .logger import setup_logger, get_logger, audit_logger, error_tracker
-from .migrations import migration_manager
-from .mock_data import MockDataGenerator
+
+# Names loaded on first access: these modules pull in the database layer
+# (and Faker), which plain config or logging users should not pay for
+_LAZY = {
+    'migration_manager': '.migrations',
+    'MockDataGenerator': '.mock_data',
+}
 
 __all__ = [
     'Config',
@@ -15,4 +21,6 @@ __all__ = [
     'error_tracker',
     'migration_manager',
     'MockDataGenerator'
-]
\ No newline at end of file
+]
+
+__getattr__ = make_lazy_getattr(__name__, _LAZY)
@@ -3,10 +3,12 @@ Mock data generation for wholesale business.
 Uses external APIs to generate realistic data.
 """
 import requests
-import random
 import time
-from typing import List, Dict, Any
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+import numpy as np
 from faker import Faker
+from sqlalchemy import insert
 from ..models import (
     db_manager, Category, Supplier, Product, InventoryMovement
 )
@@ -15,9 +17,22 @@ from ..models import (
 class MockDataGenerator:
     """Generate mock data for testing and development."""
     
-    def __init__(self):
+    # Movement type weights and quantity ranges (inclusive)
+    MOVEMENT_TYPES = ['INBOUND', 'OUTBOUND', 'ADJUSTMENT', 'RETURN', 'DAMAGED']
+    MOVEMENT_WEIGHTS = [3, 2, 1, 1, 1]  # More inbound movements
+    MOVEMENT_QUANTITY_RANGES = {
+        'INBOUND': (10, 100),
+        'OUTBOUND': (-50, -1),  # Negative for outbound
+        'ADJUSTMENT': (-20, 20),
+        'RETURN': (1, 10),
+        'DAMAGED': (-5, -1),
+    }
+    
+    def __init__(self, batch_size: int = 1000, seed: Optional[int] = None):
         self.fake = Faker()
+        self.rng = np.random.default_rng(seed)
         self.session = None
+        self.batch_size = batch_size  # Rows per multi-row INSERT round-trip
         
         # Product categories for wholesale business
         self.categories = [
@@ -134,123 +149,153 @@ class MockDataGenerator:
         }
         
         category_products = products.get(category, ["Generic Product"])
-        return random.choices(category_products, k=min(count, len(category_products)))
+        return self.rng.choice(category_products, size=min(count, len(category_products))).tolist()
     
-    def generate_suppliers(self, count: int = 15) -> List[Supplier]:
-        """Generate mock suppliers."""
-        suppliers = []
-        
+    def generate_suppliers(self, count: int = 15) -> List[Dict[str, Any]]:
+        """Generate mock supplier rows."""
         # Some realistic wholesale supplier name patterns
         supplier_types = [
             "Wholesale", "Distribution", "Supply Co", "Trading", "Import Export",
             "Global Supply", "Direct", "Bulk Supply", "Commercial"
         ]
+        payment_terms = ["Net 30", "Net 15", "COD", "Net 45", "2/10 Net 30"]
         
-        for _ in range(count):
-            company_name = self.fake.company()
-            supplier_type = random.choice(supplier_types)
-            
-            supplier = Supplier(
-                name=f"{company_name} {supplier_type}",
-                contact_email=self.fake.company_email(),
-                contact_phone=self.fake.phone_number(),
-                address=self.fake.address(),
-                tax_id=f"TAX-{self.fake.random_number(digits=9)}",
-                payment_terms=random.choice(["Net 30", "Net 15", "COD", "Net 45", "2/10 Net 30"]),
-                is_active=random.choice([True, True, True, False])  # 75% active
-            )
-            suppliers.append(supplier)
+        types = self.rng.choice(supplier_types, size=count).tolist()
+        terms = self.rng.choice(payment_terms, size=count).tolist()
+        active = (self.rng.random(count) < 0.75).tolist()  # 75% active
         
-        return suppliers
+        return [
+            {
+                'name': f"{self.fake.company()} {supplier_type}",
+                'contact_email': self.fake.company_email(),
+                'contact_phone': self.fake.phone_number(),
+                'address': self.fake.address(),
+                'tax_id': f"TAX-{self.fake.random_number(digits=9)}",
+                'payment_terms': term,
+                'is_active': is_active
+            }
+            for supplier_type, term, is_active in zip(types, terms, active)
+        ]
     
-    def generate_products(self, categories: List[Category], suppliers: List[Supplier], 
-                         products_per_category: int = 25) -> List[Product]:
-        """Generate mock products."""
-        products = []
+    def generate_products(self, categories: List[Dict[str, Any]], suppliers: List[Dict[str, Any]], 
+                         products_per_category: int = 25) -> List[Dict[str, Any]]:
+        """Generate mock product rows for persisted category and supplier rows.
         
+        Numeric columns are drawn for all products at once with NumPy.
+        """
+        names, category_ids, skus = [], [], []
         for category in categories:
-            product_names = self.generate_product_names(category.name, products_per_category)
-            sku_prefix = self.sku_prefixes.get(category.name, "GEN")
+            product_names = self.generate_product_names(category['name'], products_per_category)
+            sku_prefix = self.sku_prefixes.get(category['name'], "GEN")
+            sku_numbers = self.rng.integers(1000, 10000, size=len(product_names)).tolist()
             
-            for i, name in enumerate(product_names):
-                # Generate realistic pricing
-                cost_price = round(random.uniform(5.0, 200.0), 2)
-                wholesale_markup = random.uniform(1.3, 2.0)  # 30-100% markup
-                retail_markup = random.uniform(1.8, 3.0)      # 80-200% markup from cost
-                
-                wholesale_price = round(cost_price * wholesale_markup, 2)
-                retail_price = round(cost_price * retail_markup, 2)
-                
-                # Generate stock levels
-                current_stock = random.randint(0, 500)
-                minimum_stock = random.randint(5, 50)
-                maximum_stock = random.randint(100, 1000)
-                
-                product = Product(
-                    sku=f"{sku_prefix}-{random.randint(1000, 9999)}-{i:03d}",
-                    name=name,
-                    description=self.fake.text(max_nb_chars=200),
-                    category_id=category.id,
-                    supplier_id=random.choice(suppliers).id,
-                    cost_price=cost_price,
-                    wholesale_price=wholesale_price,
-                    retail_price=retail_price,
-                    current_stock=current_stock,
-                    minimum_stock=minimum_stock,
-                    maximum_stock=maximum_stock,
-                    weight=round(random.uniform(0.1, 10.0), 2),
-                    dimensions=f"{random.randint(5,30)}x{random.randint(5,30)}x{random.randint(2,15)}",
-                    barcode=self.fake.ean13() if random.random() > 0.3 else None,
-                    is_active=random.choice([True, True, True, False]),  # 75% active
-                    is_discontinued=random.choice([False, False, False, True])  # 25% discontinued
-                )
-                products.append(product)
+            for i, (name, sku_number) in enumerate(zip(product_names, sku_numbers)):
+                names.append(name)
+                category_ids.append(category['id'])
+                skus.append(f"{sku_prefix}-{sku_number}-{i:03d}")
+        
+        n = len(names)
+        if n == 0:
+            return []
+        
+        # Generate realistic pricing
+        cost_prices = np.round(self.rng.uniform(5.0, 200.0, n), 2)
+        wholesale_prices = np.round(cost_prices * self.rng.uniform(1.3, 2.0, n), 2)  # 30-100% markup
+        retail_prices = np.round(cost_prices * self.rng.uniform(1.8, 3.0, n), 2)     # 80-200% markup from cost
+        
+        # Generate stock levels
+        current_stock = self.rng.integers(0, 501, n)
+        minimum_stock = self.rng.integers(5, 51, n)
+        maximum_stock = self.rng.integers(100, 1001, n)
+        
+        supplier_ids = self.rng.choice([supplier['id'] for supplier in suppliers], size=n)
+        weights = np.round(self.rng.uniform(0.1, 10.0, n), 2)
+        dimensions = self.rng.integers([5, 5, 2], [31, 31, 16], size=(n, 3))
+        has_barcode = self.rng.random(n) > 0.3
+        is_active = self.rng.random(n) < 0.75         # 75% active
+        is_discontinued = self.rng.random(n) < 0.25   # 25% discontinued
         
-        return products
+        columns = zip(
+            skus, names, category_ids, supplier_ids.tolist(),
+            cost_prices.tolist(), wholesale_prices.tolist(), retail_prices.tolist(),
+            current_stock.tolist(), minimum_stock.tolist(), maximum_stock.tolist(),
+            weights.tolist(), dimensions.tolist(), has_barcode.tolist(),
+            is_active.tolist(), is_discontinued.tolist()
+        )
+        
+        return [
+            {
+                'sku': sku,
+                'name': name,
+                'description': self.fake.text(max_nb_chars=200),
+                'category_id': category_id,
+                'supplier_id': supplier_id,
+                'cost_price': cost_price,
+                'wholesale_price': wholesale_price,
+                'retail_price': retail_price,
+                'current_stock': current,
+                'minimum_stock': minimum,
+                'maximum_stock': maximum,
+                'weight': weight,
+                'dimensions': "x".join(str(d) for d in dims),
+                'barcode': self.fake.ean13() if barcode else None,
+                'is_active': active,
+                'is_discontinued': discontinued
+            }
+            for (sku, name, category_id, supplier_id, cost_price, wholesale_price, retail_price,
+                 current, minimum, maximum, weight, dims, barcode, active, discontinued) in columns
+        ]
     
-    def generate_inventory_movements(self, products: List[Product], count: int = 200) -> List[InventoryMovement]:
-        """Generate mock inventory movements."""
-        movements = []
+    def generate_inventory_movements(self, products: List[Dict[str, Any]], count: int = 200) -> List[Dict[str, Any]]:
+        """Generate mock inventory movement rows for persisted product rows.
         
-        for _ in range(count):
-            product = random.choice(products)
-            movement_type = random.choice([
-                'INBOUND', 'INBOUND', 'INBOUND',  # More inbound movements
-                'OUTBOUND', 'OUTBOUND',
-                'ADJUSTMENT',
-                'RETURN',
-                'DAMAGED'
-            ])
-            
-            # Generate quantities based on movement type
-            if movement_type == 'INBOUND':
-                quantity = random.randint(10, 100)
-            elif movement_type == 'OUTBOUND':
-                quantity = -random.randint(1, 50)  # Negative for outbound
-            elif movement_type == 'ADJUSTMENT':
-                quantity = random.randint(-20, 20)
-            elif movement_type == 'RETURN':
-                quantity = random.randint(1, 10)
-            else:  # DAMAGED
-                quantity = -random.randint(1, 5)
-            
-            movement = InventoryMovement(
-                product_id=product.id,
-                movement_type=movement_type,
-                quantity=quantity,
-                unit_cost=product.cost_price if movement_type == 'INBOUND' else None,
-                reference_number=f"{movement_type[:3]}-{self.fake.random_number(digits=8)}",
-                notes=self.fake.sentence() if random.random() > 0.7 else None,
-                from_location="Warehouse A" if movement_type == 'OUTBOUND' else None,
-                to_location="Warehouse A" if movement_type == 'INBOUND' else None
-            )
-            movements.append(movement)
+        Movement types, quantities and timestamps (spread over the last 30 days)
+        are drawn for all rows at once with NumPy.
+        """
+        if not products or count <= 0:
+            return []
+        
+        weights = np.array(self.MOVEMENT_WEIGHTS, dtype=float)
+        type_idx = self.rng.choice(len(self.MOVEMENT_TYPES), size=count, p=weights / weights.sum())
+        
+        # Generate quantities based on movement type
+        lows = np.array([self.MOVEMENT_QUANTITY_RANGES[t][0] for t in self.MOVEMENT_TYPES])
+        highs = np.array([self.MOVEMENT_QUANTITY_RANGES[t][1] for t in self.MOVEMENT_TYPES])
+        quantities = self.rng.integers(lows[type_idx], highs[type_idx] + 1)
+        
+        product_idx = self.rng.integers(0, len(products), size=count)
+        has_notes = self.rng.random(count) > 0.7
+        
+        now = np.datetime64(datetime.utcnow(), 's')
+        offsets = self.rng.integers(0, 86400 * 30, size=count).astype('timedelta64[s]')
+        timestamps = (now - offsets).tolist()
+        
+        movements = []
+        for t, qty, p_idx, notes, created_at in zip(type_idx.tolist(), quantities.tolist(),
+                                                     product_idx.tolist(), has_notes.tolist(), timestamps):
+            movement_type = self.MOVEMENT_TYPES[t]
+            product = products[p_idx]
+            movements.append({
+                'product_id': product['id'],
+                'movement_type': movement_type,
+                'quantity': qty,
+                'unit_cost': product['cost_price'] if movement_type == 'INBOUND' else None,
+                'reference_number': f"{movement_type[:3]}-{self.fake.random_number(digits=8)}",
+                'notes': self.fake.sentence() if notes else None,
+                'from_location': "Warehouse A" if movement_type == 'OUTBOUND' else None,
+                'to_location': "Warehouse A" if movement_type == 'INBOUND' else None,
+                'created_at': created_at
+            })
         
         return movements
     
     def generate_all_data(self, categories_count: int = 10, suppliers_count: int = 15,
                          products_per_category: int = 25, movements_count: int = 200):
-        """Generate all mock data and save to database."""
+        """Generate all mock data and save to database.
+        
+        Rows are built as plain dicts and written with batched multi-row INSERTs
+        inside a single transaction instead of one ORM flush per object.
+        """
         print("🚀 Starting mock data generation...")
         
         with db_manager.get_session() as session:
@@ -258,44 +303,54 @@ class MockDataGenerator:
             
             # Generate categories
             print(f"📁 Creating {categories_count} categories...")
-            db_categories = []
-            for cat_data in self.categories[:categories_count]:
-                category = Category(**cat_data)
-                session.add(category)
-                db_categories.append(category)
-            
-            session.commit()
+            db_categories = [dict(cat_data) for cat_data in self.categories[:categories_count]]
+            self._bulk_insert(session, Category, db_categories)
             print(f"✓ Created {len(db_categories)} categories")
             
             # Generate suppliers
             print(f"🏢 Creating {suppliers_count} suppliers...")
             suppliers = self.generate_suppliers(suppliers_count)
-            for supplier in suppliers:
-                session.add(supplier)
-            session.commit()
+            self._bulk_insert(session, Supplier, suppliers)
             print(f"✓ Created {len(suppliers)} suppliers")
             
             # Generate products
             print(f"📦 Creating {products_per_category * len(db_categories)} products...")
             products = self.generate_products(db_categories, suppliers, products_per_category)
-            for product in products:
-                session.add(product)
-            session.commit()
+            self._bulk_insert(session, Product, products)
             print(f"✓ Created {len(products)} products")
             
             # Generate inventory movements
             print(f"📊 Creating {movements_count} inventory movements...")
             movements = self.generate_inventory_movements(products, movements_count)
-            for movement in movements:
-                session.add(movement)
-            session.commit()
+            self._bulk_insert(session, InventoryMovement, movements, return_ids=False)
             print(f"✓ Created {len(movements)} inventory movements")
             
+            # Single commit for the whole data set
+            session.commit()
+            
             print("✅ Mock data generation completed successfully!")
             
             # Print summary statistics
             self._print_summary_stats(session)
     
+    def _bulk_insert(self, session, model, rows: List[Dict[str, Any]], return_ids: bool = True):
+        """Insert rows with batched executemany round-trips.
+        
+        When return_ids is set, the generated primary keys are written back
+        into each row dict so dependent rows can reference them.
+        """
+        if not rows:
+            return
+        
+        stmt = insert(model).execution_options(insertmanyvalues_page_size=self.batch_size)
+        if return_ids:
+            stmt = stmt.returning(model.id, sort_by_parameter_order=True)
+            ids = session.scalars(stmt, rows).all()
+            for row, row_id in zip(rows, ids):
+                row['id'] = row_id
+        else:
+            session.execute(stmt, rows)
+    
     def _print_summary_stats(self, session):
         """Print summary statistics of generated data."""
         print("\n📈 Data Summary:")
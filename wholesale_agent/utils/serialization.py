@@ -0,0 +1,34 @@
+"""
+Fast JSON serialization for conversation turns and cached payloads.
+Uses orjson when installed and falls back to the standard library.
+"""
+import json
+from dataclasses import asdict, is_dataclass
+from typing import Any, Union
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _default(obj: Any) -> Any:
+    """Serialize dataclasses as dicts and anything else unknown as a string."""
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return asdict(obj)
+    return str(obj)
+
+
+def dumps(obj: Any) -> str:
+    """Serialize an object (dataclasses included) to a JSON string."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(obj, default=_default)
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Deserialize a JSON string."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)